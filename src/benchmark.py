@@ -0,0 +1,192 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""benchmark.py
+
+Time the fretboard hot paths for every tuning and fret count, save the
+results as JSON and compare them with an earlier run.
+
+usage: benchmark.py [-h] [-o FILE] [-c FILE] ...
+
+Saturday, October 17 2026
+"""
+
+from __future__ import print_function
+
+import sys
+import json
+import time
+import platform
+import argparse
+from timeit import Timer
+
+from PyQt4.QtCore import QRectF
+from PyQt4.QtGui import (QApplication, QImage, QPainter, QColor,
+                         QStyleOptionGraphicsItem)
+
+from util import TUNINGS, parseTuning
+from fretboard import MIN_FRETS, MAX_FRETS
+from render import OffscreenNeck
+
+# a slower run than this times the baseline is a regression
+DEFAULT_THRESHOLD = 1.25
+
+
+def _benchmarks(neck, image):
+    """Return the benchmarks as a list of (name, callable) tuples.
+
+    neck -- Neck, configured for the tuning and fret count to measure
+    image -- QImage, paint target
+    """
+    fretboard = neck.fretboard
+    # the whole neck fitted to the image, as in a fitted view
+    option = QStyleOptionGraphicsItem()
+    option.exposedRect = neck.boundingRect()
+    fit = min(image.width() / option.exposedRect.width(),
+              image.height() / option.exposedRect.height())
+    def updatePP():
+        # force a geometry cache look-up
+        neck._geometryKey = None
+        neck._updatePP()
+    def paint():
+        painter = QPainter(image)
+        painter.setRenderHints(QPainter.Antialiasing)
+        painter.scale(fit, fit)
+        painter.translate(-option.exposedRect.left(),
+                          -option.exposedRect.top())
+        neck.paint(painter, option, None)
+        neck.markerLayer.paint(painter, option, None)
+        painter.end()
+    def paintScale():
+        neck.markScale('Major', 'C')
+        paint()
+    # the last 3 frets zoomed to the image width, as in a zoomed view
+    zoomOption = QStyleOptionGraphicsItem()
+    left = neck.fretXs[-4]
+    zoomOption.exposedRect = QRectF(left, 0.0, neck.fretXs[-1] - left,
+                                    neck.boundingRect().height())
+    zoom = image.width() / zoomOption.exposedRect.width()
+    def paintZoomed():
+        neck.markScale('Major', 'C')
+        painter = QPainter(image)
+        painter.setRenderHints(QPainter.Antialiasing)
+        painter.scale(zoom, zoom)
+        painter.translate(-left, 0.0)
+        neck.paint(painter, zoomOption, None)
+        neck.markerLayer.paint(painter, zoomOption, None)
+        painter.end()
+    result = [
+        ('createNotes', fretboard._createNotes),
+        ('buildGeometry',
+         lambda: neck._buildGeometry(neck.nStrings, neck.nFrets)),
+        ('updatePP', updatePP),
+        ('markAll', lambda: neck.markAll('C')),
+        ('markScale', lambda: neck.markScale('Major', 'C')),
+        ('paint', paint),
+        ('paintScale', paintScale),
+        ('paintZoomed', paintZoomed),
+        ]
+    for noteFilter in ['All', 'Natural', 'Markers']:
+        result.append(('markRandomNote ' + noteFilter,
+                       lambda f=noteFilter: neck.markRandomNote(f)))
+    return result
+def run(tunings, fretCounts, number=20, repeat=3):
+    """Run every benchmark on every tuning and fret count.
+
+    tunings -- list of tuning strings, see: util.parseTuning()
+    fretCounts -- list of integers
+    number -- integer, calls per timing
+    repeat -- integer, timings per benchmark, the fastest is kept
+
+    Return a list of dicts with the keys 'name', 'tuning', 'frets' and
+    'seconds', the time of one call.
+    """
+    neck = OffscreenNeck()
+    image = QImage(1600, 200, QImage.Format_ARGB32_Premultiplied)
+    image.fill(QColor(255, 255, 255).rgba())
+    results = []
+    for tuning in tunings:
+        for nFrets in fretCounts:
+            neck.setTuning(parseTuning(tuning))
+            neck.setFretCount(nFrets)
+            neck.updateAll()
+            for name, func in _benchmarks(neck, image):
+                seconds = min(Timer(func).repeat(repeat, number)) / number
+                results.append({'name': name, 'tuning': tuning,
+                                'frets': nFrets, 'seconds': seconds})
+    return results
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Find the benchmarks that got slower than a baseline run.
+
+    results, baseline -- lists, see: run()
+    threshold -- float, slowdown factor that counts as a regression
+
+    Return a list of (result, baselineSeconds) tuples.
+    """
+    old = dict(((r['name'], r['tuning'], r['frets']), r['seconds'])
+               for r in baseline)
+    regressions = []
+    for r in results:
+        seconds = old.get((r['name'], r['tuning'], r['frets']))
+        if seconds and r['seconds'] > seconds * threshold:
+            regressions.append((r, seconds))
+    return regressions
+def summary(results):
+    """Return the total seconds per benchmark name as a sorted list.
+    """
+    totals = {}
+    for r in results:
+        totals[r['name']] = totals.get(r['name'], 0.0) + r['seconds']
+    return sorted(totals.items())
+def parseArgs(argv):
+    """Return the parsed command line options.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the fretboard hot paths.')
+    parser.add_argument('-o', '--output', default='bench.json',
+                        help='results file, default: %(default)s')
+    parser.add_argument('-c', '--compare', metavar='FILE',
+                        help='earlier results file to compare with')
+    parser.add_argument('--threshold', type=float,
+                        default=DEFAULT_THRESHOLD,
+                        help='slowdown that counts as a regression,'
+                        ' default: %(default)s')
+    parser.add_argument('-t', '--tunings', nargs='+',
+                        default=[t for t, tip in TUNINGS],
+                        help='default: every tuning')
+    parser.add_argument('-n', '--frets', nargs='+', type=int,
+                        default=list(range(MIN_FRETS, MAX_FRETS + 1)),
+                        help='fret counts, default: {} to {}'.format(
+                            MIN_FRETS, MAX_FRETS))
+    parser.add_argument('--number', type=int, default=20,
+                        help='calls per timing, default: %(default)s')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timings per benchmark, default: %(default)s')
+    return parser.parse_args(argv)
+def main(argv):
+    """Run the benchmarks. Return 1 if a regression was found, else 0.
+    """
+    opts = parseArgs(argv)
+    app = QApplication(sys.argv, False)
+    results = run(opts.tunings, opts.frets, opts.number, opts.repeat)
+    with open(opts.output, 'w') as f:
+        json.dump({'time': time.time(),
+                   'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'results': results}, f, indent=1)
+    for name, seconds in summary(results):
+        print('{:24} {:10.3f} ms'.format(name, seconds * 1000.0))
+    if not opts.compare:
+        return 0
+    with open(opts.compare) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, opts.threshold)
+    for r, seconds in regressions:
+        print('REGRESSION {} {} {} frets: {:.1f} us -> {:.1f} us'.format(
+            r['name'], r['tuning'], r['frets'], seconds * 1e6,
+            r['seconds'] * 1e6))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
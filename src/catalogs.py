@@ -0,0 +1,190 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""catalogs.py
+
+Load user-defined tuning and scale catalogs from text files.
+
+A tuning catalog has one tuning per line, written as in TUNINGS, followed
+by an optional tool tip:
+
+    EADGBE  Std 6 string
+    DADGAD  6 string
+
+A scale catalog has one scale per line, a name, a colon and the intervals
+in semitones, see: INTERVALS:
+
+    Major: 2 2 1 2 2 2 1
+
+Blank lines and lines starting with # are ignored. A parsed catalog is
+compiled to a binary cache file that is used until the source file's
+modification time or size changes.
+
+Saturday, October 17 2026
+"""
+
+import os
+import re
+import sys
+import marshal
+import hashlib
+
+from util import TUNINGS, INTERVALS, parseTuning
+from fretboard import checkNoteName, MIN_STRINGS, MAX_STRINGS
+
+# first value of a cache file, bump CACHE_VERSION when the format changes
+CACHE_MAGIC = 'gneck catalog'
+CACHE_VERSION = 1
+
+
+def defaultCacheDir():
+    """Return the folder of the compiled catalogs.
+    """
+    return os.path.join(os.path.expanduser('~'), '.gneck', 'cache')
+def _lines(path):
+    """Generate the (line number, text) of the non-comment lines of a file.
+    """
+    with open(path) as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield n, line
+def parseTunings(path):
+    """Parse and validate a tuning catalog.
+
+    path -- string, file name
+
+    Every note must pass checkNoteName() and a tuning must have from
+    MIN_STRINGS to MAX_STRINGS strings, as required by
+    Fretboard.setTuning().
+
+    Raise Exception naming the file and line of the first error. Return a
+    list of (tuning, tip) tuples, see: TUNINGS.
+    """
+    result = []
+    for n, line in _lines(path):
+        fields = line.split(None, 1)
+        tuning = fields[0]
+        tip = fields[1] if len(fields) > 1 else tuning
+        try:
+            if not re.match(r'^([A-G][#b]?)+$', tuning):
+                raise Exception("Illegal tuning {}".format(repr(tuning)))
+            for noteName in re.findall(r'[A-G][#b]?', tuning):
+                checkNoteName(noteName)
+            nStrings = len(parseTuning(tuning))
+            if nStrings < MIN_STRINGS or nStrings > MAX_STRINGS:
+                raise Exception("tuning must have from {} to {}"
+                                " strings".format(MIN_STRINGS, MAX_STRINGS))
+        except Exception as e:
+            raise Exception('{}:{}: {}'.format(path, n, e))
+        result.append((tuning, tip))
+    return result
+def parseScales(path):
+    """Parse and validate a scale catalog.
+
+    path -- string, file name
+
+    The intervals must be positive and add up to an octave, 12 semitones.
+
+    Raise Exception naming the file and line of the first error. Return a
+    list of (name, intervals) tuples, see: INTERVALS.
+    """
+    result = []
+    for n, line in _lines(path):
+        try:
+            name, sep, intervals = line.partition(':')
+            name = name.strip()
+            if not sep or not name:
+                raise Exception("expected 'name: intervals'")
+            intervals = [int(x) for x in intervals.split()]
+            if not intervals or min(intervals) < 1 or sum(intervals) != 12:
+                raise Exception("intervals of {} must be positive and add up"
+                                " to 12".format(repr(name)))
+        except Exception as e:
+            raise Exception('{}:{}: {}'.format(path, n, e))
+        result.append((name, intervals))
+    return result
+def cachePath(path, kind, cacheDir=None):
+    """Return the cache file name of a catalog.
+
+    path -- string, catalog file name
+    kind -- string, 'tunings' or 'scales'
+    cacheDir -- string, default is defaultCacheDir()
+
+    marshal data depends on the Python version, so it is part of the name.
+    """
+    if cacheDir is None:
+        cacheDir = defaultCacheDir()
+    key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+    return os.path.join(cacheDir, '{}-{}-py{}{}.bin'.format(
+        kind, key, *sys.version_info[:2]))
+def _readCache(cacheFile, stamp):
+    """Return the cached catalog or None if it is missing or stale.
+    """
+    try:
+        with open(cacheFile, 'rb') as f:
+            header, data = marshal.loads(f.read())
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+    if header != (CACHE_MAGIC, CACHE_VERSION) + stamp:
+        return None
+    return data
+def _writeCache(cacheFile, stamp, data):
+    """Write a compiled catalog. A failure only costs a re-parse later.
+    """
+    try:
+        folder = os.path.dirname(cacheFile)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        tmp = '{}.{}.tmp'.format(cacheFile, os.getpid())
+        with open(tmp, 'wb') as f:
+            f.write(marshal.dumps(((CACHE_MAGIC, CACHE_VERSION) + stamp,
+                                   data)))
+        # replace atomically so readers never see half a file
+        if os.name == 'nt' and os.path.exists(cacheFile):
+            os.remove(cacheFile)
+        os.rename(tmp, cacheFile)
+    except (IOError, OSError):
+        pass
+def _load(path, kind, parse, cacheDir):
+    """Load a catalog through its compiled cache.
+
+    Return a list of (key, value) tuples.
+    """
+    st = os.stat(path)
+    stamp = (st.st_mtime, st.st_size)
+    cacheFile = cachePath(path, kind, cacheDir)
+    data = _readCache(cacheFile, stamp)
+    if data is None:
+        data = [tuple(x) for x in parse(path)]
+        _writeCache(cacheFile, stamp, data)
+    return data
+def loadTunings(path, cacheDir=None):
+    """Load a tuning catalog, see: parseTunings().
+
+    Return a list of (tuning, tip) tuples.
+    """
+    return _load(path, 'tunings', parseTunings, cacheDir)
+def loadScales(path, cacheDir=None):
+    """Load a scale catalog, see: parseScales().
+
+    Return a dict mapping scale names to intervals.
+    """
+    return dict((name, list(intervals))
+                for name, intervals in _load(path, 'scales', parseScales,
+                                             cacheDir))
+def install(tuningsPath=None, scalesPath=None, cacheDir=None):
+    """Add catalogs to the global TUNINGS and INTERVALS.
+
+    tuningsPath -- string or None, tuning catalog file name
+    scalesPath -- string or None, scale catalog file name
+
+    Tunings already in TUNINGS are skipped, scales replace those with the
+    same name. Return None.
+    """
+    if tuningsPath:
+        known = set(t for t, tip in TUNINGS)
+        TUNINGS.extend([x for x in loadTunings(tuningsPath, cacheDir)
+                        if x[0] not in known])
+    if scalesPath:
+        INTERVALS.update(loadScales(scalesPath, cacheDir))
@@ -0,0 +1,185 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""chords.py
+
+Find the playable voicings of a chord on a Fretboard.
+
+A voicing is a tuple with one entry per string, index 0 is the heaviest
+string as in a tuning. An entry is a fret number, 0 for the open string, or
+None for a muted string. E.g. open C major in standard tuning is
+(None, 3, 2, 0, 1, 0).
+
+Saturday, October 17 2026
+"""
+
+import heapq
+from itertools import count, islice
+
+from util import NOTES, CHORDS
+from fretboard import checkNoteName
+
+# most fingers available to fret notes, a barre counts as one
+MAX_FINGERS = 4
+
+
+def chordMask(rootPc, intervals):
+    """Return the pitch classes of a chord as a 12 bit mask.
+
+    rootPc -- integer 0 to 11, index into NOTES
+    intervals -- list of semitones above the root, see: CHORDS
+    """
+    mask = 0
+    for i in intervals:
+        mask |= 1 << ((rootPc + i) % 12)
+    return mask
+def bitCount(mask):
+    """Return the number of bits set in the integer mask.
+    """
+    return bin(mask).count('1')
+def playability(voicing):
+    """Score how easy a voicing is to play.
+
+    Small spans, low positions, few fingers, open strings and no muted
+    strings between sounding strings are preferred.
+
+    Return a float, higher is better.
+    """
+    fretted = [f for f in voicing if f]
+    sounding = [n for n, f in enumerate(voicing) if f is not None]
+    cost = 0.0
+    if fretted:
+        cost += max(fretted) - min(fretted)
+        cost += 0.2 * min(fretted)
+        cost += 0.5 * len(fretted)
+    # muted strings between the lowest and highest sounding string
+    cost += 2.0 * sum(1 for f in voicing[sounding[0]:sounding[-1]+1]
+                      if f is None)
+    cost += 1.0 * voicing.count(None)
+    return -cost
+def costBound(base):
+    """Return the least cost, see: playability(), of a voicing whose lowest
+    fretted note is on fret base, 0 if only open strings are played.
+
+    It grows with base, so windows searched in fret order can yield every
+    voicing at or below the bound of the next window.
+    """
+    if not base:
+        return 0.0
+    # the fretted note on base
+    return 0.2 * base + 0.5
+
+
+def _search(options, base, chord, rootPc, need, bRootInBass):
+    """Enumerate the voicings of one fret window.
+
+    options -- list, per string heaviest first, of (fret, pitch class)
+               tuples that belong to the chord
+    base -- integer, the lowest fretted note must be on this fret, 0 if
+            only open strings are allowed
+    chord -- integer, see: chordMask()
+    rootPc -- integer, pitch class of the root
+    need -- integer, minimum number of sounding strings
+    bRootInBass -- bool, if True the lowest sounding note is the root
+
+    Suffixes are memoized by the state that decides how they may be
+    completed, so shared suffixes are only searched once.
+
+    Return a list of voicings.
+    """
+    nStrings = len(options)
+    memo = {}
+    def search(s, missing, bBase, fingers, sounding, bStarted):
+        key = (s, missing, bBase, fingers, sounding, bStarted)
+        result = memo.get(key)
+        if result is not None:
+            return result
+        left = nStrings - s
+        if bitCount(missing) > left or need - sounding > left:
+            # not enough strings left to complete the chord
+            result = []
+        elif s == nStrings:
+            result = [()] if bBase or not base else []
+        else:
+            result = [(None,) + x for x in search(s + 1, missing, bBase,
+                                                  fingers, sounding,
+                                                  bStarted)]
+            for fret, pc in options[s]:
+                if bRootInBass and not bStarted and pc != rootPc:
+                    continue
+                f = fingers
+                if fret > base or (fret == base and fret and not bBase):
+                    f += 1
+                if f > MAX_FINGERS:
+                    continue
+                result.extend([(fret,) + x
+                               for x in search(s + 1,
+                                               missing & ~(1 << pc),
+                                               bBase or fret == base,
+                                               f, min(sounding + 1, need),
+                                               True)])
+        memo[key] = result
+        return result
+    return search(0, chord, False, 0, 0, False)
+def voicings(fretboard, rootName, chord, maxSpan=4, minStrings=3,
+             bRootInBass=True):
+    """Generate the playable voicings of a chord, best first.
+
+    fretboard -- Fretboard, its tuning and fret count are used
+    rootName -- see: checkNoteName()
+    chord -- a key found in CHORDS or a list of semitones above the root
+    maxSpan -- integer, most frets covered by the fretted notes
+    minStrings -- integer, fewest sounding strings
+    bRootInBass -- bool, if True the lowest sounding note is the root
+
+    Every chord tone sounds in each voicing. The search is pruned when too
+    few strings are left to complete the chord or too many fingers are
+    needed.
+
+    The fret windows are searched lazily, lowest first. A voicing is
+    generated as soon as no later window can hold a better one, see:
+    costBound(), so the first voicings come before the whole neck is
+    searched.
+
+    Raise Exception if rootName or chord is unknown. Generate (score,
+    voicing) tuples, see: playability().
+    """
+    rootPc = NOTES.index(checkNoteName(rootName))
+    if not isinstance(chord, list):
+        intervals = CHORDS.get(chord)
+        if intervals is None:
+            raise Exception('Unknown chord name: {}'.format(repr(chord)))
+    else:
+        intervals = chord
+    mask = chordMask(rootPc, intervals)
+    need = max(bitCount(mask), minStrings)
+    # pitch classes, heaviest string first
+    pcs = [[NOTES.index(note) for note in stringNotes]
+           for stringNotes in fretboard.allNotes[::-1]]
+    nFrets = fretboard.nFrets
+    heap = []
+    tieBreak = count()
+    for base in range(nFrets + 1):
+        bound = costBound(base)
+        while heap and heap[0][0] <= bound:
+            score, n, voicing = heapq.heappop(heap)
+            yield -score, voicing
+        frets = [0]
+        if base:
+            frets += range(base, min(base + maxSpan, nFrets + 1))
+        options = [[(f, stringPcs[f]) for f in frets
+                    if mask >> stringPcs[f] & 1]
+                   for stringPcs in pcs]
+        for voicing in _search(options, base, mask, rootPc, need,
+                               bRootInBass):
+            heapq.heappush(heap, (-playability(voicing), next(tieBreak),
+                                  voicing))
+    while heap:
+        score, n, voicing = heapq.heappop(heap)
+        yield -score, voicing
+def bestVoicings(fretboard, rootName, chord, n=5, **kwargs):
+    """Return the n best voicings of a chord.
+
+    See: voicings(). Return a list of (score, voicing) tuples.
+    """
+    return list(islice(voicings(fretboard, rootName, chord, **kwargs), n))
@@ -0,0 +1,304 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""drill.py
+
+Spaced repetition for the note drill. Answers are kept per user, tuning and
+neck position in a local SQLite database. The next position is picked from
+the weakest positions that are due.
+
+Saturday, October 17 2026
+"""
+
+import os
+import sqlite3
+import threading
+from time import time
+from random import random, choice
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+
+# seconds until a position is due again, by Leitner box
+BOX_INTERVALS = [0, 30, 120, 600, 3600, 6 * 3600, 24 * 3600, 7 * 24 * 3600]
+# answers slower than this (seconds) count as fully slow
+SLOW_LATENCY = 5.0
+
+
+def defaultStatsPath():
+    """Return the path of the per-machine stats database.
+    """
+    return os.path.join(os.path.expanduser('~'), '.gneck', 'stats.sqlite')
+
+
+class StatsStore(object):
+    """Drill answers and per-position statistics in a SQLite database.
+
+    Writes are queued and committed in batches by a background thread, so
+    recording an answer never waits on the disk. Reads use their own
+    connection and see the queued answers too, so they never wait on the
+    writer either. The database is in WAL mode so reads and writes do not
+    block each other.
+    """
+    # maximum answers per transaction
+    batchSize = 64
+    # seconds to wait for more answers before committing a batch
+    batchDelay = 0.5
+    def __init__(self, path=None):
+        """Open or create the database.
+
+        path -- string, database file name, default is defaultStatsPath(),
+                ':memory:' is not supported because of the writer thread
+        """
+        if path is None:
+            path = defaultStatsPath()
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        with self.db:
+            self.db.executescript("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    user TEXT, tuning TEXT, string INTEGER, fret INTEGER,
+                    correct INTEGER, latency REAL, time REAL);
+                CREATE INDEX IF NOT EXISTS answersIdx
+                    ON answers (user, tuning, string, fret);
+                CREATE TABLE IF NOT EXISTS positions (
+                    user TEXT, tuning TEXT, string INTEGER, fret INTEGER,
+                    seen INTEGER, correct INTEGER, latency REAL,
+                    box INTEGER, due REAL,
+                    PRIMARY KEY (user, tuning, string, fret));
+                """)
+        self._queue = Queue()
+        # (user, tuning, string, fret) -> positions row not yet committed
+        self._pending = {}
+        self._pendingLock = threading.Lock()
+        self._writer = threading.Thread(target=self._write)
+        self._writer.daemon = True
+        self._writer.start()
+    def load(self, user, tuning):
+        """Return the statistics of every position drilled so far.
+
+        user -- string
+        tuning -- string, see: DrillScheduler.tuningKey()
+
+        Queued answers are included. Return a dict mapping (string, fret)
+        to a PositionStats.
+        """
+        # before the SELECT: a row committed in between is then in the
+        # snapshot, the database or both, never in neither
+        with self._pendingLock:
+            pending = [row for row in self._pending.values()
+                       if row[0] == user and row[1] == tuning]
+        rows = self.db.execute("""
+            SELECT string, fret, seen, correct, latency, box, due
+            FROM positions WHERE user = ? AND tuning = ?""", (user, tuning))
+        result = dict(((row[0], row[1]), PositionStats(*row[2:]))
+                      for row in rows)
+        # pending rows are never older than the committed ones
+        for row in pending:
+            result[(row[2], row[3])] = PositionStats(*row[4:])
+        return result
+    def record(self, user, tuning, string, fret, correct, latency, stats):
+        """Queue an answer and the updated statistics of its position.
+
+        user, tuning -- see: load()
+        string, fret -- integers, the position drilled
+        correct -- bool, True if the first guess was right
+        latency -- float, seconds from showing the note to the guess
+        stats -- PositionStats, the position's statistics after the answer
+
+        Return None.
+        """
+        row = (user, tuning, string, fret, stats.seen, stats.correct,
+               stats.latency, stats.box, stats.due)
+        with self._pendingLock:
+            self._pending[row[:4]] = row
+        self._queue.put(((user, tuning, string, fret, int(correct), latency,
+                          time()), row))
+    def flush(self):
+        """Wait until every queued answer is committed. Return None.
+        """
+        self._queue.join()
+    def close(self):
+        """Commit queued answers, stop the writer and close the database.
+
+        Return None.
+        """
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self.db.close()
+    def _write(self):
+        """Writer thread. Commit queued answers in batches.
+        """
+        db = sqlite3.connect(self.path)
+        bStop = False
+        while not bStop:
+            batch = [self._queue.get()]
+            while len(batch) < self.batchSize and batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get(timeout=self.batchDelay))
+                except Empty:
+                    break
+            bStop = batch[-1] is None
+            items = [x for x in batch if x is not None]
+            if items:
+                with db:
+                    db.executemany("INSERT INTO answers"
+                                   " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   [x[0] for x in items])
+                    db.executemany("INSERT OR REPLACE INTO positions"
+                                   " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                   [x[1] for x in items])
+                with self._pendingLock:
+                    for x in items:
+                        # unless a newer answer is queued
+                        if self._pending.get(x[1][:4]) is x[1]:
+                            del self._pending[x[1][:4]]
+            for x in batch:
+                self._queue.task_done()
+        db.close()
+
+
+class PositionStats(object):
+    """Drill statistics of one neck position.
+    """
+    __slots__ = ['seen', 'correct', 'latency', 'box', 'due']
+    def __init__(self, seen=0, correct=0, latency=0.0, box=0, due=0.0):
+        """Initialize the statistics.
+
+        seen -- integer, number of answers
+        correct -- integer, number of correct answers
+        latency -- float, running mean of the answer latency in seconds
+        box -- integer, Leitner box, index into BOX_INTERVALS
+        due -- float, time the position should be drilled again
+        """
+        self.seen = seen
+        self.correct = correct
+        self.latency = latency
+        self.box = box
+        self.due = due
+    def weakness(self):
+        """Return a float, higher for positions the user knows less well.
+        """
+        # unseen positions are assumed to be half known
+        errors = 1.0 - (self.correct + 1.0) / (self.seen + 2.0)
+        slowness = min(self.latency / SLOW_LATENCY, 1.0)
+        return errors + 0.5 * slowness
+    def update(self, correct, latency, now):
+        """Account for an answer.
+
+        correct -- bool
+        latency -- float, seconds
+        now -- float, time of the answer
+
+        Return None.
+        """
+        self.seen += 1
+        self.latency += (latency - self.latency) / self.seen
+        if correct:
+            self.correct += 1
+            self.box = min(self.box + 1, len(BOX_INTERVALS) - 1)
+        else:
+            self.box = 0
+        self.due = now + BOX_INTERVALS[self.box]
+
+
+class DrillScheduler(object):
+    """Pick drill positions by weakness and due time.
+
+    The statistics of the current user and tuning are held in memory. The
+    store is only read when the tuning changes.
+    """
+    def __init__(self, fretboard, store, user):
+        """Initialize the scheduler.
+
+        fretboard -- Fretboard, its tuning and pools are used
+        store -- StatsStore
+        user -- string
+        """
+        self.fretboard = fretboard
+        self.store = store
+        self.user = user
+        self.tuning = None
+        # (string, fret) -> PositionStats, for self.tuning
+        self.stats = {}
+        # (string, fret) last returned by nextPosition()
+        self.position = None
+    def tuningKey(self):
+        """Return the fretboard tuning as a string, e.g. 'E A D G B E'.
+        """
+        return ' '.join(self.fretboard.tuning)
+    def _checkTuning(self):
+        """Load the statistics if the fretboard tuning changed.
+        """
+        tuning = self.tuningKey()
+        if tuning != self.tuning:
+            self.stats = self.store.load(self.user, tuning)
+            self.tuning = tuning
+            self.position = None
+    def nextPosition(self, noteFilter='All'):
+        """Pick the next position to drill.
+
+        noteFilter -- see: Fretboard.markRandomNote()
+
+        Positions that are due are picked with a probability proportional to
+        their weakness. If none is due, the one due first is picked. The last
+        position is not repeated.
+
+        Return a (string, fret) tuple.
+        """
+        self._checkTuning()
+        pool = self.fretboard.candidates(noteFilter)
+        if len(pool) > 1 and self.position in pool:
+            pool = [x for x in pool if x != self.position]
+        now = time()
+        unseen = PositionStats()
+        due = []
+        total = 0.0
+        for position in pool:
+            stats = self.stats.get(position, unseen)
+            if stats.due <= now:
+                weight = stats.weakness()
+                due.append((weight, position))
+                total += weight
+        if not due:
+            self.position = min(pool, key=lambda x: self.stats[x].due)
+        elif total <= 0.0:
+            self.position = choice(due)[1]
+        else:
+            pick = random() * total
+            for weight, position in due:
+                pick -= weight
+                if pick < 0.0:
+                    break
+            self.position = position
+        return self.position
+    def record(self, correct, latency, position=None):
+        """Record an answer.
+
+        correct -- bool, True if the first guess was right
+        latency -- float, seconds from showing the note to the guess
+        position -- (string, fret) tuple, default is the last position
+                    returned by nextPosition()
+
+        The answer is recorded for the tuning of the last nextPosition().
+
+        Return None.
+        """
+        if self.tuning is None:
+            self._checkTuning()
+        if position is None:
+            position = self.position
+        stats = self.stats.get(position)
+        if stats is None:
+            stats = self.stats[position] = PositionStats()
+        stats.update(correct, latency, time())
+        string, fret = position
+        self.store.record(self.user, self.tuning, string, fret, correct,
+                          latency, stats)
@@ -0,0 +1,294 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""fingering.py
+
+Split a scale on a Fretboard into playable position patterns, instead of
+marking every scale note on the whole neck.
+
+A pattern is a run of consecutive scale notes, ascending from the heaviest
+string to the lightest with at least one note on each string. A note is
+only left out if it is out of reach, e.g. the gap of a box between strings
+tuned a fifth apart. Two kinds are found:
+
+    '3nps' -- three notes per string (two for scales of fewer than six
+              notes), the hand shifts along the neck as it goes up
+    'box'  -- every note within a few frets, the hand stays in one position,
+              like the CAGED shapes
+
+The notes of a box may be split over the strings in many ways. The best
+split is found by dynamic programming over (string, note) states, costing
+the stretch of the notes on each string and the shift of the hand between
+strings. A 3nps pattern has exactly its count of notes on every string, the
+same costs rank the patterns. Solved states are memoized per run and whole
+results are cached per tuning, fret count, scale and key, so every key and
+scale in INTERVALS is solved in a few milliseconds.
+
+usage: fingering.py [-h] [-t TUNING] [-n FRETS] [-k {3nps,box}] SCALE KEY
+
+Saturday, October 17 2026
+"""
+
+from __future__ import print_function
+
+import sys
+import argparse
+import threading
+from collections import OrderedDict
+
+from util import NOTES, INTERVALS, parseTuning, scalePitchClasses
+from fretboard import checkNoteName
+from marks import Marks
+
+KINDS = ('3nps', 'box')
+# frets between the lowest and highest fretted note on one string
+MAX_STRETCH = 5
+# frets a box covers beyond its first fret
+BOX_SPAN = 4
+# cost per fret of stretch on a string and per fret of hand shift
+STRETCH_COST = 0.5
+SHIFT_COST = 1.0
+# reward per note of a box run, so boxes hold every note they can
+NOTE_REWARD = 4.0
+
+
+class Pattern(object):
+    """A fingering of a scale run.
+
+    kind -- see: KINDS
+    degree -- integer, 1 based scale degree of the first note
+    positions -- tuple of (string, fret) tuples, lowest note first, string
+                 0 is the lightest string as in Fretboard.allNotes
+    roots -- tuple of (string, fret) tuples, the key's notes
+    cost -- float, see: solveRun(), lower is easier
+    """
+    __slots__ = ['kind', 'degree', 'positions', 'roots', 'cost']
+    def __init__(self, kind, degree, positions, roots, cost):
+        self.kind = kind
+        self.degree = degree
+        self.positions = tuple(positions)
+        self.roots = tuple(roots)
+        self.cost = cost
+    @property
+    def lowFret(self):
+        """The lowest fretted fret, 0 if only open strings are played.
+        """
+        return min([f for s, f in self.positions if f] or [0])
+    @property
+    def highFret(self):
+        return max(f for s, f in self.positions)
+    def marks(self, nStrings):
+        """Return the pattern as Marks, see: Fretboard.setMarks().
+        """
+        return Marks.fromPositions(nStrings, self.positions, self.roots)
+    def __repr__(self):
+        return '<Pattern {} degree {} frets {}-{}>'.format(
+            self.kind, self.degree, self.lowFret, self.highFret)
+
+
+def scalePitches(openPitches, nFrets, pitchClasses):
+    """Return the MIDI pitches of a scale on a neck, lowest first.
+
+    openPitches -- list of MIDI pitches of the open strings, heaviest first
+    nFrets -- integer
+    pitchClasses -- set of integers 0 to 11, index into NOTES
+    """
+    # MIDI 21 is A0, NOTES starts at A
+    return [p for p in range(min(openPitches), max(openPitches) + nFrets + 1)
+            if (p - 21) % 12 in pitchClasses]
+def solveRun(pitches, start, openPitches, lo, hi, nps):
+    """Split a scale run over the strings at the least cost.
+
+    pitches -- see: scalePitches()
+    start -- integer, index into pitches of the first note, played on the
+             heaviest string
+    openPitches -- see: scalePitches()
+    lo, hi -- integer, frets every note must be within
+    nps -- integer or None, notes on each string, None allows one to four
+           notes on a string
+
+    A note is only left out if the strings it is on cross it outside of lo
+    and hi, e.g. between strings a fifth apart.
+
+    The cost of a string is STRETCH_COST per fret from its lowest to its
+    highest fretted note, plus SHIFT_COST per fret its first note is from
+    the first note of the previous string. Open strings neither stretch nor
+    shift. If nps is None each note of the run lowers the cost by
+    NOTE_REWARD.
+
+    Return a (cost, frets) tuple, frets is a list per string heaviest first
+    of the frets played on it, or None if the run can not be played.
+    """
+    nStrings = len(openPitches)
+    nPitches = len(pitches)
+    maxNotes = 4 if nps is None else nps
+    memo = {}
+    def best(s, i, prevFret):
+        """Return the best (cost, frets) of strings s and up, starting with
+        pitches[i] on string s, or None.
+        """
+        key = (s, i, prevFret)
+        if key in memo:
+            return memo[key]
+        result = None
+        openPitch = openPitches[s]
+        frets = []
+        for j in range(i, min(i + maxNotes, nPitches)):
+            fret = pitches[j] - openPitch
+            if fret < lo or fret > hi:
+                break
+            frets.append(fret)
+            fretted = [f for f in frets if f]
+            if fretted and fretted[-1] - fretted[0] > MAX_STRETCH:
+                break
+            if nps is not None and len(frets) < nps:
+                continue
+            cost = 0.0 if nps else -NOTE_REWARD * len(frets)
+            if fretted:
+                cost += STRETCH_COST * (fretted[-1] - fretted[0])
+            if frets[0] and prevFret:
+                cost += SHIFT_COST * abs(frets[0] - prevFret)
+            if s + 1 < nStrings:
+                # skip the notes below the window of the next string, if
+                # they are above the window of this one
+                k = j + 1
+                while (k < nPitches and pitches[k] - openPitches[s + 1] < lo
+                       and pitches[k] - openPitch > hi):
+                    k += 1
+                if k >= nPitches:
+                    break
+                rest = best(s + 1, k, frets[0])
+                if rest is None:
+                    continue
+                cost += rest[0]
+                candidate = (cost, [list(frets)] + rest[1])
+            else:
+                candidate = (cost, [list(frets)])
+            if result is None or candidate[0] < result[0]:
+                result = candidate
+        memo[key] = result
+        return result
+    if start >= nPitches:
+        return None
+    return best(0, start, 0)
+def _patterns(openPitches, nFrets, pitchClasses, rootPc, kind):
+    """Return the patterns of a scale, see: patterns().
+    """
+    if kind not in KINDS:
+        raise Exception('Unknown pattern kind: {}'.format(repr(kind)))
+    nStrings = len(openPitches)
+    pitches = scalePitches(openPitches, nFrets, set(pitchClasses))
+    degrees = dict((pc, n + 1) for n, pc in enumerate(pitchClasses))
+    result = []
+    seen = set()
+    for start, p in enumerate(pitches):
+        fret = p - openPitches[0]
+        if fret < 0 or fret > nFrets:
+            continue
+        if kind == 'box':
+            solved = solveRun(pitches, start, openPitches, fret,
+                              min(fret + BOX_SPAN, nFrets), None)
+        else:
+            nps = 3 if len(pitchClasses) > 5 else 2
+            # open strings only in the open position
+            solved = solveRun(pitches, start, openPitches, 1 if fret else 0,
+                              nFrets, nps)
+        if solved is None:
+            continue
+        cost, frets = solved
+        positions = []
+        roots = []
+        for s, stringFrets in enumerate(frets):
+            # index 0 is the lightest string in a Fretboard
+            string = nStrings - 1 - s
+            for f in stringFrets:
+                positions.append((string, f))
+                if (openPitches[s] + f - 21) % 12 == rootPc:
+                    roots.append((string, f))
+        key = frozenset(positions)
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append(Pattern(kind, degrees[(p - 21) % 12], positions,
+                              roots, cost))
+    return result
+# (open pitches, nFrets, pitch classes, kind) -> list of Pattern
+_cache = OrderedDict()
+_cacheLock = threading.Lock()
+# results kept
+CACHE_SIZE = 512
+def patterns(fretboard, scaleName, keyName, kind='3nps'):
+    """Return the position patterns of a scale.
+
+    fretboard -- Fretboard, its tuning and fret count are used
+    scaleName -- a key found in INTERVALS
+    keyName -- see: checkNoteName()
+    kind -- see: KINDS
+
+    One pattern is found for each note of the scale on the heaviest string
+    that starts a playable run, duplicates are dropped. Results are cached,
+    the patterns are shared and must not be modified.
+
+    Raise Exception if scaleName, keyName or kind is unknown. Return a list
+    of Pattern, lowest on the neck first.
+    """
+    try:
+        keyName = checkNoteName(keyName)
+    except:
+        raise Exception('Unknown key name: {}'.format(repr(keyName)))
+    intervals = INTERVALS.get(scaleName, None)
+    if intervals is None:
+        raise Exception('Unknown scale name: {}'.format(repr(scaleName)))
+    rootPc = NOTES.index(keyName)
+    pitchClasses = tuple(scalePitchClasses(rootPc, intervals))
+    nStrings = len(fretboard.allNotes)
+    # heaviest first, as in a tuning
+    openPitches = tuple(fretboard.pitch(s, 0)
+                        for s in range(nStrings - 1, -1, -1))
+    key = (openPitches, fretboard.nFrets, pitchClasses, kind)
+    with _cacheLock:
+        result = _cache.pop(key, None)
+        if result is not None:
+            _cache[key] = result
+            return result
+    result = _patterns(openPitches, fretboard.nFrets, pitchClasses, rootPc,
+                       kind)
+    with _cacheLock:
+        _cache.pop(key, None)
+        if len(_cache) >= CACHE_SIZE:
+            _cache.popitem(last=False)
+        _cache[key] = result
+    return result
+def parseArgs(argv):
+    """Return the parsed command line options.
+    """
+    parser = argparse.ArgumentParser(
+        description='Print the position patterns of a scale.')
+    parser.add_argument('scale', metavar='SCALE',
+                        help='scale name, e.g. Major')
+    parser.add_argument('key', metavar='KEY', help='key name, e.g. Bb')
+    parser.add_argument('-t', '--tuning', default='EADGBE',
+                        help='default: %(default)s')
+    parser.add_argument('-n', '--frets', type=int, default=22,
+                        help='default: %(default)s')
+    parser.add_argument('-k', '--kind', choices=KINDS, default='3nps',
+                        help='default: %(default)s')
+    return parser.parse_args(argv)
+def main(argv):
+    from fretboard import Fretboard
+    opts = parseArgs(argv)
+    fretboard = Fretboard(parseTuning(opts.tuning), opts.frets)
+    nStrings = len(fretboard.allNotes)
+    for pattern in patterns(fretboard, opts.scale, opts.key, opts.kind):
+        print('degree {}, frets {}-{}, cost {:.1f}'.format(
+            pattern.degree, pattern.lowFret, pattern.highFret, pattern.cost))
+        # heaviest string last, as seen from the player
+        for string in range(nStrings):
+            print('  {:2} |{}'.format(
+                fretboard.allNotes[string][0],
+                ' '.join(str(f) for s, f in pattern.positions
+                         if s == string)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,115 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""fretarray.py
+
+Vectorized fretboard theory with NumPy. Compute the notes of many tunings
+at once and find the positions of every scale in every key in one batched
+operation.
+
+Positions use the same layout as Neck.allNotes: axis -2 is the string, index
+0 is the lightest string, axis -1 is the fret, index 0 is the open string.
+Tunings with fewer strings are padded with -1 pitch classes.
+
+Saturday, October 17 2026
+"""
+
+import numpy as np
+
+from util import NOTES, TUNINGS, INTERVALS, parseTuning
+
+
+def tuningPitchClasses(tunings=None):
+    """Return the open string pitch classes of several tunings.
+
+    tunings -- list of tunings, each a string such as 'EADGBE' or a list of
+               note names from heaviest to lightest string. The default is
+               every tuning in TUNINGS.
+
+    Return a (T, S) int8 array, S is the largest string count. Row n holds
+    tuning n with its lightest string first, padded with -1.
+    """
+    if tunings is None:
+        tunings = [t for t, tip in TUNINGS]
+    tunings = [parseTuning(t) if isinstance(t, str) else t for t in tunings]
+    nStrings = max(len(t) for t in tunings)
+    result = np.full((len(tunings), nStrings), -1, dtype=np.int8)
+    for row, tuning in enumerate(tunings):
+        result[row, :len(tuning)] = [NOTES.index(n) for n in tuning[::-1]]
+    return result
+def semitoneMatrix(tunings=None, nFrets=22):
+    """Return the pitch class of every position of several tunings.
+
+    tunings -- see: tuningPitchClasses()
+    nFrets -- integer, number of frets
+
+    Return a (T, S, nFrets+1) int8 array of pitch classes 0 to 11 (indices
+    into NOTES), -1 for padded strings.
+    """
+    opens = tuningPitchClasses(tunings).astype(np.int16)
+    frets = np.arange(nFrets + 1, dtype=np.int16)
+    result = (opens[:, :, np.newaxis] + frets) % 12
+    result[opens < 0] = -1
+    return result.astype(np.int8)
+def scaleMasks(scaleNames=None):
+    """Return the pitch class membership of several scales in every key.
+
+    scaleNames -- list of keys found in INTERVALS, the default is every
+                  scale in sorted order
+
+    Return a (N, 12, 12) bool array. Entry [n, k, pc] is True if pitch class
+    pc belongs to scale n in the key with pitch class k.
+    """
+    if scaleNames is None:
+        scaleNames = sorted(INTERVALS.keys())
+    base = np.zeros((len(scaleNames), 12), dtype=bool)
+    for row, name in enumerate(scaleNames):
+        intervals = INTERVALS.get(name)
+        if intervals is None:
+            raise Exception('Unknown scale name: {}'.format(repr(name)))
+        base[row, np.cumsum([0] + intervals[:-1]) % 12] = True
+    pcs = np.arange(12)
+    # rotate each scale to all 12 keys, idx[k, pc] = (pc - k) mod 12
+    idx = (pcs[np.newaxis, :] - pcs[:, np.newaxis]) % 12
+    return base[:, idx]
+def scalePositions(tunings=None, nFrets=22, scaleNames=None):
+    """Find the positions of several scales in every key on several tunings.
+
+    tunings -- see: tuningPitchClasses()
+    nFrets -- integer, number of frets
+    scaleNames -- see: scaleMasks()
+
+    Return a (T, N, 12, S, nFrets+1) bool array. Entry [t, n, k, s, f] is
+    True if fret f of string s in tuning t belongs to scale n in key k.
+    """
+    matrix = semitoneMatrix(tunings, nFrets)
+    valid = matrix >= 0
+    masks = scaleMasks(scaleNames)
+    # (N, 12, T, S, F) -> (T, N, 12, S, F)
+    result = masks[:, :, np.where(valid, matrix, 0)]
+    result = np.moveaxis(result, 2, 0)
+    return result & valid[:, np.newaxis, np.newaxis]
+def rootPositions(tunings=None, nFrets=22):
+    """Find the positions of every key's root note on several tunings.
+
+    tunings -- see: tuningPitchClasses()
+    nFrets -- integer, number of frets
+
+    Return a (T, 12, S, nFrets+1) bool array. Entry [t, k, s, f] is True if
+    fret f of string s in tuning t is the note with pitch class k.
+    """
+    matrix = semitoneMatrix(tunings, nFrets)
+    keys = np.arange(12, dtype=np.int8)
+    return matrix[:, np.newaxis] == keys[:, np.newaxis, np.newaxis]
+def markedNotes(positions, roots=None):
+    """Convert one position mask to a Neck.markedNotes style list.
+
+    positions -- (S, F) bool array, e.g. scalePositions()[t, n, k]
+    roots -- (S, F) bool array or None, e.g. rootPositions()[t, k]
+
+    Return a list of (string, fret, bRootNote) tuples.
+    """
+    if roots is None:
+        roots = np.zeros_like(positions)
+    return [(int(s), int(f), bool(roots[s, f]))
+            for s, f in np.argwhere(positions)]
@@ -0,0 +1,399 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""fretboard.py
+
+The music theory of a fretted, stringed instrument neck, without any GUI.
+Neck draws a Fretboard.
+
+Saturday, October 17 2026
+"""
+
+import threading
+from random import choice, sample
+from itertools import cycle
+from collections import OrderedDict
+
+from util import NOTES, SHARP2FLAT, INTERVALS, scalePitchClasses
+from marks import Marks
+
+# open string and neck marker frets
+MARKER_FRETS = [0, 3, 5, 7, 9, 12, 15, 17, 19, 21, 24, 27, 29, 31, 33, 36]
+# string and fret count limits, see: setTuning() and setFretCount()
+MIN_STRINGS = 2
+MAX_STRINGS = 32
+MIN_FRETS = 2
+MAX_FRETS = 36
+# MIDI pitch range of the heaviest open string, B1 to Bb2, see: pitch()
+LOWEST_PITCH = 35
+
+
+def checkNoteName(noteName):
+    """Ensure noteName is valid.
+
+    A valid note is one found in the global NOTES or in the keys of the
+    global dict SHARP2FLAT.
+
+    Return a valid note name or raise Exception if invalid.
+    """
+    if noteName not in NOTES:
+        flatName = SHARP2FLAT.get(noteName)
+        if flatName is None:
+            raise Exception("Illegal note {}".format(repr(noteName)))
+        noteName = flatName
+    return noteName
+def scaleMarks(pcBits, scaleName, keyName):
+    """Return the marks of a scale, see: Fretboard.markScale().
+
+    pcBits -- see: Fretboard.pcBits
+    scaleName -- a key found in INTERVALS
+    keyName -- see: checkNoteName()
+
+    Only reads pcBits, so it may run in any thread. Raise Exception if
+    either scaleName or keyName is unknown. Return Marks.
+    """
+    try:
+        keyName = checkNoteName(keyName)
+    except:
+        raise Exception('Unknown key name: {}'.format(repr(keyName)))
+    intervals = INTERVALS.get(scaleName, None)
+    if intervals is None:
+        raise Exception('Unknown scale name: {}'.format(repr(scaleName)))
+    rootPc = NOTES.index(keyName)
+    return pitchClassMarks(pcBits, scalePitchClasses(rootPc, intervals),
+                           rootPc)
+def pitchClassMarks(pcBits, pitchClasses, rootPc=None):
+    """Return the marks of pitch classes, see: Fretboard.markPitchClasses().
+
+    pcBits -- see: Fretboard.pcBits
+
+    Return Marks.
+    """
+    bits = [0] * len(pcBits[0])
+    roots = None
+    for pc in pitchClasses:
+        bits = [a | b for a, b in zip(bits, pcBits[pc])]
+        if pc == rootPc:
+            roots = pcBits[pc]
+    return Marks(bits, roots)
+
+
+class Fretboard(object):
+    """The notes of a fretted, stringed instrument neck.
+
+    The neck may have MIN_FRETS to MAX_FRETS frets and the tuning may be
+    configured. The number of strings will be derived from the tuning.
+    """
+    # (tuning, nFrets) -> note tables, see: _createNotes()
+    _tableCache = OrderedDict()
+    _tableLock = threading.Lock()
+    tableCacheSize = 64
+    def __init__(self, tuning="E A D G B E".split(), nFrets=22):
+        """Initialize a fretboard.
+
+        tuning -- A list of open string notes. Index 0 is the heaviest
+                  string. The default is: ['E', 'A', 'D', 'G', 'B', 'E']
+                  Use b for flat and # for sharp, e.g. A#, Bb.
+                  B#, Cb, E#, and Fb are illegal.
+        nFrets -- integer, number of frets between MIN_FRETS and MAX_FRETS,
+                  default is 22
+        """
+        self.setTuning(tuning)
+        self.setFretCount(nFrets)
+        self.updateNotes()
+    def setTuning(self, tuning):
+        """Configure the string tuning.
+
+        tuning -- list of notes names as strings, from heaviest to lightest
+                  string. 
+
+        Does not call updateNotes(). Return None.
+        """
+        result = []
+        self.nStrings = len(tuning)
+        # Minimum of 2 to simplify drawing the neck.
+        # Max is arbitrary to prevent drawing zillions of strings.
+        if self.nStrings < MIN_STRINGS or self.nStrings > MAX_STRINGS:
+            raise Exception("tuning must have from {} to {} strings".format(
+                MIN_STRINGS, MAX_STRINGS))
+        for noteName in tuning:
+            try:
+                result.append(checkNoteName(noteName))
+            except:
+                raise Exception("Illegal note name"
+                                " in tuning: {}".format(repr(noteName)))
+        self.tuning = result
+    def setFretCount(self, n):
+        """Set the number of frets on the neck
+
+        n -- integer between MIN_FRETS and MAX_FRETS
+
+        Does not call updateNotes(). Raise Exception if n is out of range.
+        Return None.
+        """
+        if n < MIN_FRETS or n > MAX_FRETS:
+            raise Exception("number of frets must be an integer from"
+                            " {} to {}, not {}".format(MIN_FRETS, MAX_FRETS,
+                                                      repr(n)))
+        self.nFrets = n
+    def updateNotes(self):
+        """Clear the marked notes and look up the note tables.
+
+        The tables only depend on the tuning and fret count, so they are
+        taken from a cache shared by all fretboards when possible. Call after
+        setTuning() or setFretCount(). Return None.
+        """
+        # the marked positions, see: markedNotes
+        self.marks = Marks.empty(self.nStrings)
+        # (marks A, marks B) shown by compare() or None
+        self.comparison = None
+        key = (tuple(self.tuning), self.nFrets)
+        cache = Fretboard._tableCache
+        # fretboards may be used in several threads, see: server.py
+        with Fretboard._tableLock:
+            tables = cache.pop(key, None)
+            if tables is None:
+                tables = self._createNotes()
+                if len(cache) >= self.tableCacheSize:
+                    # drop the least recently used
+                    cache.popitem(last=False)
+            cache[key] = tables
+        self._tables = tables
+        self.allNotes = tables['allNotes']
+        self.pcBits = tables['pcBits']
+    def _getMarkedNotes(self):
+        return self.marks.markedNotes()
+    def _setMarkedNotes(self, markedNotes):
+        self.setMarks(Marks.fromMarkedNotes(self.nStrings, markedNotes))
+    # list of (string, fret, bRootNote) tuples, a view of self.marks
+    markedNotes = property(_getMarkedNotes, _setMarkedNotes)
+    def _createNotes(self):
+        """Create the note tables of the tuning and fret count.
+
+        'allNotes' is a MxN array of all note names on the neck.
+        M is self.nStrings
+        N is self.nFrets (+1 for the open string).
+
+        'pcBits' holds the positions of each pitch class as per-string
+        bitsets, see: Marks. A pitch class is the index of a note name in
+        NOTES.
+
+        'openPitches' holds the MIDI pitch of each open string, see:
+        pitch().
+
+        'pools' is None, it is created on first use, see: candidates().
+
+        The tables are shared, do not modify them. Return a dict.
+        """
+        # index 0 is the bottom (lightest) string
+        allNotes = [[] for n in range(self.nStrings)]
+        t = self.tuning[-1::-1]
+        for string in range(self.nStrings):
+            i = NOTES.index(t[string])
+            notes = NOTES[i:] + NOTES[:i]
+            for f, note in enumerate(cycle(notes)):
+                if f > self.nFrets:
+                    break
+                allNotes[string].append(note)
+        # pitch class, NOTES index -> bitset per string
+        pcBits = [[0] * self.nStrings for n in range(len(NOTES))]
+        for string, stringNotes in enumerate(allNotes):
+            for fret, note in enumerate(stringNotes):
+                pcBits[NOTES.index(note)][string] |= 1 << fret
+        pcBits = [tuple(bits) for bits in pcBits]
+        # the heaviest string in the octave from LOWEST_PITCH, each lighter
+        # string the smallest step above the one before, A is MIDI 21 + 12n
+        openPitches = []
+        for noteName in self.tuning:
+            pc = NOTES.index(noteName)
+            if not openPitches:
+                midi = 21 + pc
+                midi += 12 * ((LOWEST_PITCH - midi + 11) // 12)
+            else:
+                midi = openPitches[-1] + ((pc - openPitches[-1] + 21) % 12
+                                          or 12)
+            openPitches.append(midi)
+        return {'allNotes': allNotes, 'pcBits': pcBits,
+                'openPitches': openPitches[::-1], 'pools': None}
+    def _createPools(self):
+        """Create the candidate positions of each random note filter.
+
+        Return a dict mapping a filter name, see: markRandomNote(), to a
+        list of (string, fret) tuples.
+        """
+        allPositions = [(string, fret)
+                        for string, stringNotes in enumerate(self.allNotes)
+                        for fret in range(len(stringNotes))]
+        return {
+            'All': allPositions,
+            # no flats allowed
+            'Natural': [(string, fret) for string, fret in allPositions
+                        if 'b' not in self.allNotes[string][fret]],
+            # only open notes or notes on markers
+            'Markers': [(string, fret) for string, fret in allPositions
+                        if fret in MARKER_FRETS]}
+    def candidates(self, noteFilter='All'):
+        """Return the candidate positions for noteFilter.
+
+        noteFilter -- see: markRandomNote(), unknown filters are treated as
+                      'All'
+
+        Return a list of (string, fret) tuples, do not modify it.
+        """
+        pools = self._tables['pools']
+        if pools is None:
+            # a race only builds the same pools twice
+            pools = self._tables['pools'] = self._createPools()
+        return pools.get(noteFilter, pools['All'])
+    def pitch(self, string, fret):
+        """Return the MIDI pitch of a position, 69 is A440.
+
+        string -- integer, index into self.allNotes
+        fret -- integer, 0 is the open string
+
+        The tuning only names pitch classes, so the heaviest string is placed
+        between B1 and Bb2 and each lighter string is the smallest step above
+        the next heavier string, e.g. EADGBE is E2 A2 D3 G3 B3 E4.
+        """
+        return self._tables['openPitches'][string] + fret
+    def pitchPositions(self, pitch):
+        """Return the positions sounding a MIDI pitch, see: pitch().
+
+        Return a list of (string, fret) tuples, empty if the pitch is not on
+        the neck.
+        """
+        return [(string, pitch - openPitch) for string, openPitch
+                in enumerate(self._tables['openPitches'])
+                if 0 <= pitch - openPitch <= self.nFrets]
+    def markedPitches(self):
+        """Return the MIDI pitches of the marked notes, lowest first.
+
+        Positions sounding the same pitch are returned once.
+        """
+        return sorted(set(self.pitch(string, fret)
+                          for string, fret in self.marks))
+    def markPosition(self, string, fret):
+        """Mark a single position for display on the neck.
+
+        string -- integer, index into self.allNotes
+        fret -- integer, 0 is the open string
+
+        Return the note name at the position.
+        """
+        self.setMarks(Marks.fromPositions(self.nStrings, [(string, fret)]))
+        return self.allNotes[string][fret]
+    def markRandomNote(self, noteFilter='All'):
+        """Mark a random note for display on the neck.
+
+        noteFilter -- one of:
+                      * 'All', any note is okay
+                      * 'Natural', no sharps or flats
+                      * 'Markers', only open notes or notes on neck markers
+
+        Every position allowed by the filter is equally likely. Return the
+        note selected.
+        """
+        string, fret = choice(self.candidates(noteFilter))
+        return self.markPosition(string, fret)
+    def randomPositions(self, n, noteFilter='All'):
+        """Draw n different random positions, e.g. for a drill sequence.
+
+        n -- integer, number of positions
+        noteFilter -- see: markRandomNote()
+
+        Does not mark anything. Raise Exception if the filter allows fewer
+        than n positions. Return a list of (string, fret) tuples.
+        """
+        pool = self.candidates(noteFilter)
+        if n > len(pool):
+            raise Exception("only {} positions for filter {}, not {}".format(
+                len(pool), repr(noteFilter), n))
+        return sample(pool, n)
+    def markPitchClasses(self, pitchClasses, rootPc=None):
+        """Mark every position of each pitch class for display.
+
+        pitchClasses -- iterable of integers 0 to 11, indices into NOTES
+        rootPc -- integer or None, positions of this pitch class are marked as
+                  root notes
+
+        Return None.
+        """
+        self.setMarks(pitchClassMarks(self.pcBits, pitchClasses, rootPc))
+    def markVoicing(self, voicing, rootPc=None):
+        """Mark the notes of a chord voicing for display.
+
+        voicing -- see: chords.py, index 0 is the heaviest string
+        rootPc -- integer or None, positions of this pitch class are marked as
+                  root notes
+
+        Return None.
+        """
+        positions = []
+        roots = []
+        for n, fret in enumerate(voicing):
+            if fret is None:
+                continue
+            # self.allNotes index 0 is the lightest string
+            string = self.nStrings - 1 - n
+            positions.append((string, fret))
+            if NOTES.index(self.allNotes[string][fret]) == rootPc:
+                roots.append((string, fret))
+        self.setMarks(Marks.fromPositions(self.nStrings, positions, roots))
+    def markAll(self, noteName):
+        """Mark every position of noteName for display.
+
+        noteName -- see: checkNoteName()
+        
+        Return None.
+        """
+        noteName = checkNoteName(noteName)
+        self.markPitchClasses([NOTES.index(noteName)])
+    def markScale(self, scaleName, keyName):
+        """Mark the scale in the given key.
+
+        scaleName -- a key found in INTERVALS
+        keyName -- see: checkNoteName()
+
+        Raise Exception if either scaleName or keyName is unknown. Return
+        None.
+        """
+        self.setMarks(scaleMarks(self.pcBits, scaleName, keyName))
+    def setMarkedNotes(self, markedNotes):
+        """Mark notes for display.
+
+        markedNotes -- list of (string, fret, bRoot) tuples
+
+        Return None.
+        """
+        self.markedNotes = markedNotes
+    def setMarks(self, marks):
+        """Mark precomputed notes, e.g. from scaleMarks().
+
+        marks -- Marks of this fretboard's tuning and fret count
+
+        Ends a comparison, see: compare(). Return None.
+        """
+        self.marks = marks
+        self.comparison = None
+    def compare(self, marksA, marksB):
+        """Overlay two markings for comparison, e.g. of two scales.
+
+        marksA, marksB -- Marks
+
+        The positions of both are marked. A display tells apart the shared
+        positions, marksA & marksB, and those only in one, marksA - marksB
+        and marksB - marksA. Return None.
+        """
+        self.marks = marksA | marksB
+        self.comparison = (marksA, marksB)
+    def compareScales(self, scaleA, keyA, scaleB, keyB):
+        """Overlay two scales for comparison, see: compare().
+
+        Raise Exception if a scale or key name is unknown. Return None.
+        """
+        self.compare(scaleMarks(self.pcBits, scaleA, keyA),
+                     scaleMarks(self.pcBits, scaleB, keyB))
+    def checkNoteName(self, noteName):
+        """See: checkNoteName()
+        """
+        return checkNoteName(noteName)
@@ -0,0 +1,136 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""latency.py
+
+Time user actions from the event to the finished repaint. Each action is a
+named sequence of stages, e.g. 'markAll', ending with 'paint'. Finished
+actions are kept for an on-screen overlay and written to a rolling
+JSON-lines log.
+
+Saturday, October 17 2026
+"""
+
+import os
+import json
+import time
+import logging
+from logging.handlers import RotatingFileHandler
+from collections import deque
+from timeit import default_timer
+
+
+def defaultLogPath():
+    """Return the path of the latency log.
+    """
+    return os.path.join(os.path.expanduser('~'), '.gneck', 'latency.jsonl')
+
+
+class LatencyProbe(object):
+    """Time actions end to end.
+
+    Call begin() when the event arrives, mark() after each stage and end()
+    when the repaint is finished. A disabled probe does nothing.
+    """
+    # finished actions kept for display
+    historySize = 10
+    def __init__(self, bEnabled=False, logPath=None, maxBytes=1 << 20,
+                 backupCount=3):
+        """Initialize the probe.
+
+        bEnabled -- bool, if False begin(), mark() and end() do nothing
+        logPath -- string, JSON-lines log file, default is defaultLogPath(),
+                   '' for no log
+        maxBytes -- integer, log size that starts a new file
+        backupCount -- integer, number of old log files kept
+        """
+        self.bEnabled = bEnabled
+        # finished actions, newest last, see: end()
+        self.history = deque(maxlen=self.historySize)
+        self._action = None
+        self._start = 0.0
+        self._stages = []
+        self._log = None
+        if bEnabled and logPath != '':
+            if logPath is None:
+                logPath = defaultLogPath()
+            folder = os.path.dirname(logPath)
+            if folder and not os.path.isdir(folder):
+                os.makedirs(folder)
+            self._log = logging.getLogger('gneck.latency')
+            self._log.propagate = False
+            self._log.setLevel(logging.INFO)
+            # the logger is shared by every probe, log each line once
+            if not self._log.handlers:
+                handler = RotatingFileHandler(logPath, maxBytes=maxBytes,
+                                              backupCount=backupCount)
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self._log.addHandler(handler)
+    def pending(self):
+        """Return True if an action waits for end().
+        """
+        return self._action is not None
+    def begin(self, action):
+        """Start timing an action.
+
+        action -- string, e.g. 'nextNote'
+
+        An unfinished earlier action, e.g. one that caused no repaint, is
+        ended without a total, see: end(). Return None.
+        """
+        if not self.bEnabled:
+            return
+        if self._action is not None:
+            self.end(None)
+        self._action = action
+        self._stages = []
+        self._start = default_timer()
+    def mark(self, stage):
+        """Record the time since begin() at the end of a stage.
+
+        stage -- string, e.g. 'markAll'
+
+        Return None.
+        """
+        if self._action is not None:
+            self._stages.append((stage, default_timer() - self._start))
+    def end(self, stage='paint'):
+        """Finish the current action.
+
+        stage -- string or None, name of the final stage, None if the action
+                 never finished, e.g. it caused no repaint
+
+        The action is added to self.history and logged as a dict with the
+        keys 'action', 'time', 'total' and 'stages', a list of [stage,
+        seconds since begin()]. total is the seconds since begin() or None
+        if stage is None. Return the dict or None if no action was pending.
+        """
+        if self._action is None:
+            return None
+        total = None
+        if stage is not None:
+            self.mark(stage)
+            total = self._stages[-1][1]
+        result = {'action': self._action,
+                  'time': time.time(),
+                  'total': total,
+                  'stages': self._stages}
+        self._action = None
+        self.history.append(result)
+        if self._log is not None:
+            self._log.info(json.dumps(result))
+        return result
+    def overlayLines(self):
+        """Return the latest actions as text lines, newest first.
+        """
+        lines = []
+        for result in reversed(self.history):
+            stages = ' '.join('{} {:.1f}'.format(name, seconds * 1000.0)
+                              for name, seconds in result['stages'])
+            if result['total'] is None:
+                total = 'unfinished'
+            else:
+                total = '{:7.1f} ms'.format(result['total'] * 1000.0)
+            lines.append('{:12} {}  [{}]'.format(result['action'], total,
+                                                 stages))
+        return lines
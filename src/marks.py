@@ -0,0 +1,136 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""marks.py
+
+Marked neck positions as bitsets, one integer per string with bit n set if
+fret n is marked. Set operations on whole markings are a few integer
+operations per string, e.g. to overlay two scales or to find the markers
+that changed since the last repaint.
+
+Saturday, October 17 2026
+"""
+
+
+def bitPositions(bits):
+    """Generate the (string, fret) of the set bits of per-string bitsets.
+    """
+    for string, b in enumerate(bits):
+        while b:
+            low = b & -b
+            yield string, low.bit_length() - 1
+            b ^= low
+
+
+class Marks(object):
+    """Immutable marked positions, some of them root notes.
+
+    String index 0 is the lightest string, as in Fretboard.allNotes. Root
+    notes are always marked positions.
+    """
+    __slots__ = ['bits', 'roots']
+    def __init__(self, bits, roots=None):
+        """Initialize the marks.
+
+        bits -- sequence of integers, one bitset per string
+        roots -- sequence of integers or None, the root note bitsets
+        """
+        self.bits = tuple(bits)
+        if roots is None:
+            self.roots = (0,) * len(self.bits)
+        else:
+            self.roots = tuple(r & b for r, b in zip(roots, self.bits))
+    @classmethod
+    def empty(cls, nStrings):
+        """Return Marks without any position marked.
+        """
+        return cls((0,) * nStrings)
+    @classmethod
+    def fromPositions(cls, nStrings, positions, rootPositions=()):
+        """Return the Marks of (string, fret) tuples.
+
+        rootPositions -- (string, fret) tuples, the root notes
+        """
+        bits = [0] * nStrings
+        for string, fret in positions:
+            bits[string] |= 1 << fret
+        roots = [0] * nStrings
+        for string, fret in rootPositions:
+            roots[string] |= 1 << fret
+            bits[string] |= 1 << fret
+        return cls(bits, roots)
+    @classmethod
+    def fromMarkedNotes(cls, nStrings, markedNotes):
+        """Return the Marks of (string, fret, bRoot) tuples.
+        """
+        markedNotes = list(markedNotes)
+        return cls.fromPositions(
+            nStrings, [(s, f) for s, f, bRoot in markedNotes],
+            [(s, f) for s, f, bRoot in markedNotes if bRoot])
+    def __or__(self, other):
+        """Return the positions marked in either, roots of either.
+        """
+        return Marks([a | b for a, b in zip(self.bits, other.bits)],
+                     [a | b for a, b in zip(self.roots, other.roots)])
+    def __and__(self, other):
+        """Return the positions marked in both, roots of either.
+        """
+        return Marks([a & b for a, b in zip(self.bits, other.bits)],
+                     [a | b for a, b in zip(self.roots, other.roots)])
+    def __sub__(self, other):
+        """Return the positions marked only in self, roots of self.
+        """
+        return Marks([a & ~b for a, b in zip(self.bits, other.bits)],
+                     self.roots)
+    def __xor__(self, other):
+        """Return the positions marked in only one, roots of either.
+        """
+        return Marks([a ^ b for a, b in zip(self.bits, other.bits)],
+                     [a | b for a, b in zip(self.roots, other.roots)])
+    def __eq__(self, other):
+        return (isinstance(other, Marks) and self.bits == other.bits
+                and self.roots == other.roots)
+    def __ne__(self, other):
+        return not self == other
+    def __hash__(self):
+        return hash((self.bits, self.roots))
+    def __len__(self):
+        """Return the number of marked positions.
+        """
+        return sum(bin(b).count('1') for b in self.bits)
+    def __bool__(self):
+        return any(self.bits)
+    __nonzero__ = __bool__
+    def __contains__(self, position):
+        string, fret = position
+        return bool(self.bits[string] >> fret & 1)
+    def __iter__(self):
+        """Generate the marked (string, fret) positions.
+        """
+        return bitPositions(self.bits)
+    def isRoot(self, string, fret):
+        return bool(self.roots[string] >> fret & 1)
+    def rootMarks(self):
+        """Return the root notes as Marks.
+        """
+        return Marks(self.roots, self.roots)
+    def changed(self, other):
+        """Return the positions whose marking differs, e.g. to repaint.
+
+        A position differs if only one marks it or only one marks it as a
+        root note.
+        """
+        n = max(len(self.bits), len(other.bits))
+        bits = self.bits + (0,) * (n - len(self.bits))
+        otherBits = other.bits + (0,) * (n - len(other.bits))
+        roots = self.roots + (0,) * (n - len(self.roots))
+        otherRoots = other.roots + (0,) * (n - len(other.roots))
+        return Marks([(a ^ b) | (ra ^ rb) for a, b, ra, rb
+                      in zip(bits, otherBits, roots, otherRoots)])
+    def markedNotes(self):
+        """Return a list of (string, fret, bRoot) tuples, see:
+        Fretboard.markedNotes.
+        """
+        roots = self.roots
+        return [(string, fret, bool(roots[string] >> fret & 1))
+                for string, fret in bitPositions(self.bits)]
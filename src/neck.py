@@ -7,83 +7,104 @@ Sunday, August 25 2013
 """
 
 from math import sin, asin, degrees
-from random import randrange, choice
-from itertools import cycle
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 
-from PyQt4.QtCore import QPointF, QRectF
-from PyQt4.QtGui import (QGraphicsPathItem, QBrush, QPen, QTransform, QColor,
-                         QPainterPath)
+from PyQt4.QtCore import QRectF
+from PyQt4.QtGui import (QGraphicsItem, QGraphicsPathItem, QBrush, QPen,
+                         QTransform, QColor, QPainterPath)
 from PyQt4.QtCore import Qt as qt
 
-from util import NOTES, SHARP2FLAT, INTERVALS, listRot
+from fretboard import Fretboard, checkNoteName, MARKER_FRETS
+
+# below this many pixels per neck unit, fine details are not drawn
+DETAIL_LOD = 24.0
+
+
+def setItemCached(item, bValue):
+    """Cache item as a pixmap in device coordinates, or not at all.
+
+    item -- QGraphicsItem
+    bValue -- bool, False to disable the cache, e.g. when rendering
+              offscreen
+
+    The pixmap has the item's size on screen, so it is sharp at any view
+    size and the painter sees the view transform, see: DETAIL_LOD. Panning
+    reuses it, item.update() or a view scale change, e.g. a window resize,
+    re-renders it. Return None.
+    """
+    if bValue:
+        item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+    else:
+        item.setCacheMode(QGraphicsItem.NoCache)
 
 
 class Neck(QGraphicsPathItem):
     """A graphical representation of a fretted, stringed instrument neck.
 
-    The neck may have 2 to 24 frets, be left or right-handed, and the tuning
-    may be configured. The number of strings will be derived from the tuning.
+    The neck may have as many frets as a Fretboard allows, be left or
+    right-handed, and the tuning may be configured. The number of strings
+    will be derived from the tuning.
+
+    Only the frets in the exposed rect are painted, so the paint cost of a
+    zoomed neck follows what is on screen. Below DETAIL_LOD pixels per unit
+    on screen the fret dots and the headstock are left out. The painter
+    transform is the view transform, cached or not, see: setItemCached().
     """
     # NOTE: all these are fudged for aesthetics
     markerDia = 0.25
     nutThickness = 0.1875
     stringSpacing = .375
     stringEdgeOffset = .06      # y distance from edge of neck to string
+    # (nStrings, nFrets) -> geometry, see: _buildGeometry()
+    _geometryCache = OrderedDict()
+    geometryCacheSize = 32
+    # False to never cache, see: setItemCached()
+    bCacheable = True
     def __init__(self, tuning="E A D G B E".split(), nFrets=22, parent=None):
         """Initialize a neck.
 
-        tuning -- A list of open string notes. Index 0 is the heaviest
-                  string. The default is: ['E', 'A', 'D', 'G', 'B', 'E']
-                  Use b for flat and # for sharp, e.g. A#, Bb.
-                  B#, Cb, E#, and Fb are illegal.
-        nFrets -- integer, number of frets between 2 and 24, default is 22
+        tuning -- see: Fretboard.__init__()
+        nFrets -- see: Fretboard.__init__()
         parent -- QGraphicsItem or None, default is None
         """
         super(Neck, self).__init__(parent)
         # a little thicker lines
         self.setPen(QPen(QColor(0, 0, 0), .025))
-        # list of (string, fret, bRootNote) tuples
-        self.markedNotes = []
-        self.setTuning(tuning)
-        self.setFretCount(nFrets)
+        # paint() needs option.exposedRect
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        # item caches on, see: setCached()
+        self.bCached = True
+        # (nStrings, nFrets) of the current path
+        self._geometryKey = None
+        # the notes, independent of the drawing
+        self.fretboard = Fretboard(tuning, nFrets)
+        self.markerLayer = MarkerLayer(self)
         self.updateAll()
+    tuning = property(lambda self: self.fretboard.tuning)
+    nStrings = property(lambda self: self.fretboard.nStrings)
+    nFrets = property(lambda self: self.fretboard.nFrets)
+    allNotes = property(lambda self: self.fretboard.allNotes)
+    # list of (string, fret, bRootNote) tuples, see: marks
+    markedNotes = property(lambda self: self.fretboard.markedNotes)
+    marks = property(lambda self: self.fretboard.marks)
     def setTuning(self, tuning):
         """Configure the string tuning.
 
-        tuning -- list of notes names as strings, from heaviest to lightest
-                  string. 
-
-        Does not call update(). Return None.
+        See: Fretboard.setTuning(). Does not call update(). Return None.
         """
-        result = []
-        self.nStrings = len(tuning)
-        # Minimum of 2 to simplify drawing the neck.
-        # Max is arbitrarily 20 to prevent drawing zillions of strings.
-        if self.nStrings < 2 or self.nStrings > 20:
-            raise Exception("tuning must have from 2 to 20 strings")
-        for noteName in tuning:
-            try:
-                result.append(self.checkNoteName(noteName))
-            except:
-                raise Exception("Illegal note name"
-                                " in tuning: {}".format(repr(noteName)))
-        self.tuning = result
+        self.fretboard.setTuning(tuning)
     def setFretCount(self, n):
         """Set the number of frets on the neck
 
-        n -- integer between 2 and 24
-
-        Raise Exception if n not 2 to 24. Return None.
+        See: Fretboard.setFretCount(). Does not call update(). Return None.
         """
-        if n < 2 or n > 24:
-            raise Exception("number of frets must be an integer from"
-                            " 2 to 24, not {}".format(repr(n)))
-        self.nFrets = n
+        self.fretboard.setFretCount(n)
     def updateAll(self):
-        self.markedNotes = []
-        self._createNotes()
+        self.fretboard.updateNotes()
         self._updatePP()
         self.update()
+        self.markerLayer.updateMarkers(True)
     def setLeftHanded(self, bValue):
         """Configure the neck as left or right-handed.
 
@@ -96,201 +117,353 @@ class Neck(QGraphicsPathItem):
         else:
             self.setTransform(QTransform().scale(1, 1))
     def _updatePP(self):
-        """Create the neck geometry updating this item's QPainterPath.
+        """Update this item's QPainterPath and the neck coordinates.
+
+        The geometry only depends on the string and fret counts, so it is
+        taken from a cache shared by all necks when possible.
 
         Return None.
         """
+        key = (self.nStrings, self.nFrets)
+        if key == self._geometryKey:
+            return
+        cache = Neck._geometryCache
+        geometry = cache.pop(key, None)
+        if geometry is None:
+            geometry = self._buildGeometry(*key)
+            if len(cache) >= self.geometryCacheSize:
+                # drop the least recently used
+                cache.popitem(last=False)
+        cache[key] = geometry
         self.prepareGeometryChange()
-        pp = QPainterPath()
-        stringSpan = (self.nStrings - 1) * self.stringSpacing
-        nutWidth = stringSpan + self.stringEdgeOffset * 2
+        self.markerLayer.prepareGeometryChange()
+        pp, self.fretXs, self.stringYs, self.openX, self._paths = geometry
+        self.setPath(pp)
+        self._geometryKey = key
+        self._updateCaches()
+    def setCached(self, bValue):
+        """Turn the item caches on or off.
+
+        bValue -- bool, False e.g. while zoomed in, where a cache would
+                  render the whole neck and culling pays off
+
+        Return None.
+        """
+        if bValue != self.bCached:
+            self.bCached = bValue
+            self._updateCaches()
+    def _updateCaches(self):
+        bValue = self.bCached and self.bCacheable
+        setItemCached(self, bValue)
+        setItemCached(self.markerLayer, bValue)
+    def visibleFrets(self, rect):
+        """Return the range of frets that intersect rect.
+
+        rect -- QRectF in item coordinates
+
+        Fret n is the space from fret line n-1 (the nut for 1) to fret line
+        n. The open strings are not included.
+        """
+        fretXs = self.fretXs
+        first = max(bisect_left(fretXs, rect.left()), 1)
+        last = min(bisect_right(fretXs, rect.right()), len(fretXs) - 1)
+        return range(first, last + 1)
+    def paint(self, painter, option, widget):
+        """Draw the frets in the exposed rect.
+
+        Return None.
+        """
+        rect = option.exposedRect
+        if rect.isEmpty():
+            rect = self.boundingRect()
+        bDetail = (option.levelOfDetailFromTransform(painter.worldTransform())
+                   >= DETAIL_LOD)
+        paths = self._paths
+        painter.setPen(self.pen())
+        painter.setBrush(self.brush())
+        if rect.left() <= 0.0:
+            painter.drawPath(paths['nut'])
+            if bDetail:
+                painter.drawPath(paths['head'])
+        for n in self.visibleFrets(rect):
+            painter.drawPath(paths['frets'][n])
+            if bDetail and paths['dots'][n] is not None:
+                painter.drawPath(paths['dots'][n])
+    def markerRect(self, string, fret):
+        """Return the QRectF covering the marker of a neck position.
+
+        string -- integer, index into self.allNotes
+        fret -- integer, 0 is the open string
+        """
+        if fret == 0:
+            # special case for open notes
+            x = self.openX
+        else:
+            x = (self.fretXs[fret-1] + self.fretXs[fret]) / 2.0
+        # a little extra for the pen
+        d = self.markerDia * 1.2
+        return QRectF(x - d / 2.0, self.stringYs[string] - d / 2.0, d, d)
+    @classmethod
+    def _buildGeometry(cls, nStrings, nFrets):
+        """Create the geometry of a neck.
+
+        nStrings -- integer, number of strings
+        nFrets -- integer, number of frets
+
+        Return a (QPainterPath, fretXs, stringYs, openX, paths) tuple. The
+        path is the outline of the whole neck. fretXs and stringYs are tuples
+        of floats, openX is the x coordinate of open string note markers.
+        paths is a dict of the QPainterPaths painted, see: paint():
+        'frets' -- list, item n is fret n with its strings and edges, item 0
+                   is None
+        'dots' -- list, item n is the marker dots of fret n or None
+        'nut' -- the nut
+        'head' -- the partial headstock and the open strings
+        """
+        stringSpan = (nStrings - 1) * cls.stringSpacing
+        nutWidth = stringSpan + cls.stringEdgeOffset * 2
+        stringYs = [cls.stringEdgeOffset + cls.stringSpacing * n
+                    for n in range(nStrings)]
         # frets
         scaleLen = 25.5
         offset = 0.0            # previous fret x coordinate
-        self.fretXs = [0.0]
-        for n in range(self.nFrets):
+        fretXs = [0.0]
+        fretPaths = [None]
+        for n in range(nFrets):
             pos = offset + (scaleLen - offset) / 17.817
-            self.fretXs.append(pos)
+            fretXs.append(pos)
+            pp = QPainterPath()
             pp.moveTo(pos, nutWidth)
             pp.lineTo(pos, 0.0)
+            # strings and the edges of the neck
+            for y in [0.0] + stringYs + [nutWidth]:
+                pp.moveTo(offset, y)
+                pp.lineTo(pos, y)
+            fretPaths.append(pp)
             offset = pos
         # marker dots
+        dotPaths = [None] * (nFrets + 1)
         y = nutWidth / 2.0
-        for n in [3, 5, 7, 9, 12, 15, 17, 19, 21, 24]:
-            if n > self.nFrets:
+        for n in MARKER_FRETS[1:]:
+            if n > nFrets:
                 break
-            fretX1 = self.fretXs[n-1]
-            fretX2 = self.fretXs[n]
+            fretX1 = fretXs[n-1]
+            fretX2 = fretXs[n]
             x = fretX1 + (fretX2 - fretX1) / 2.0
-            d = self.markerDia
+            d = cls.markerDia
             r = d / 2.0
             dy = nutWidth / 4.0
+            pp = QPainterPath()
             if n % 12 == 0:
                 pp.addEllipse(x-r, y-r-dy, d, d)
                 pp.addEllipse(x-r, y-r+dy, d, d)
             else:
                 pp.addEllipse(x-r, y-r, d, d)
-        # strings
-        self.stringYs = []
-        endX = self.fretXs[-1]
-        for n in range(self.nStrings):
-            y = self.stringEdgeOffset + self.stringSpacing * n
-            self.stringYs.append(y)
-            pp.moveTo(-self.nutThickness - self.fretXs[1] / 2.0, y)
-            pp.lineTo(endX, y)
-        # outline
-        pp.addRect(0, 0, self.fretXs[-1], nutWidth)
+            dotPaths[n] = pp
         # nut
-        pp.addRect(-self.nutThickness, 0, self.nutThickness, nutWidth)
+        nutPath = QPainterPath()
+        nutPath.addRect(-cls.nutThickness, 0, cls.nutThickness, nutWidth)
         # partial headstock, to allow room for open note display
+        headPath = QPainterPath()
+        for y in stringYs:
+            headPath.moveTo(-cls.nutThickness - fretXs[1] / 2.0, y)
+            headPath.lineTo(-cls.nutThickness, y)
         # upper curve
         r = 2.0
-        d = self.fretXs[1] / 2.0
-        rectL = -self.nutThickness - r
+        d = fretXs[1] / 2.0
+        rectL = -cls.nutThickness - r
         rect = QRectF(rectL, -r*2.0, r*2.0, r*2.0)
         ra = asin(d / r)
         da = degrees(ra)
-        pp.arcMoveTo(rect, 270.0)
-        pp.arcTo(rect, 270.0, -da)
+        headPath.arcMoveTo(rect, 270.0)
+        headPath.arcTo(rect, 270.0, -da)
         # lower curve
         rect = QRectF(rectL, nutWidth, r*2.0, r*2.0)
-        pp.arcMoveTo(rect, 90.0)
-        pp.arcTo(rect, 90.0, da)
+        headPath.arcMoveTo(rect, 90.0)
+        headPath.arcTo(rect, 90.0, da)
+        # outline, for the bounding rect and shape
+        pp = QPainterPath()
+        pp.addRect(0, 0, fretXs[-1], nutWidth)
+        pp.addPath(nutPath)
+        pp.addPath(headPath)
         # x coordinate of open string note markers
-        self.openX = (-self.nutThickness - sin(ra) * r) / 2.0
-        self.setPath(pp)
-    def _createNotes(self):
-        """Create a MxN array of all note names on the neck.
-
-        M is self.nStrings
-        N is self.nFrets (+1 for the open string).
+        openX = (-cls.nutThickness - sin(ra) * r) / 2.0
+        return (pp, tuple(fretXs), tuple(stringYs), openX,
+                {'frets': fretPaths, 'dots': dotPaths, 'nut': nutPath,
+                 'head': headPath})
+    def markRandomNote(self, noteFilter='All'):
+        """Mark a random note for display on the neck.
 
-        Return None.
+        See: Fretboard.markRandomNote(). Only changed markers are updated.
+        Return the note selected.
         """
-        # index 0 is the bottom (lightest) string
-        self.allNotes = [[] for n in range(self.nStrings)]
-        t = self.tuning[-1::-1]
-        for string in range(self.nStrings):
-            i = NOTES.index(t[string])
-            notes = NOTES[i:] + NOTES[:i]
-            for f, note in enumerate(cycle(notes)):
-                if f > self.nFrets:
-                    break
-                self.allNotes[string].append(note)
-    def paint(self, painter, option, widget):
-        """Draw the neck.
+        noteName = self.fretboard.markRandomNote(noteFilter)
+        self.markerLayer.updateMarkers()
+        return noteName
+    def markPosition(self, string, fret):
+        """Mark a single position for display on the neck.
 
-        The base class draws the neck geometry. This function draws any marked
-        notes.
+        See: Fretboard.markPosition(). Only changed markers are updated.
+        Return the note name at the position.
+        """
+        noteName = self.fretboard.markPosition(string, fret)
+        self.markerLayer.updateMarkers()
+        return noteName
+    def markPitchClasses(self, pitchClasses, rootPc=None):
+        """Mark every position of each pitch class for display.
 
+        See: Fretboard.markPitchClasses(). Only changed markers are updated.
         Return None.
         """
-        super(Neck, self).paint(painter, option, widget)
-        for string, fret, root in self.markedNotes:
-            if root:
-                # mark root notes different color
-                painter.setBrush(QBrush(QColor(255, 0, 0)))
-                painter.setPen(QColor(255, 0, 0))
-            else:
-                painter.setBrush(QBrush(QColor(0, 0, 0)))
-                painter.setPen(QColor(0, 0, 0))
-            if fret == 0:
-                # special case for open notes
-                x = self.openX
-            else:
-                x = (self.fretXs[fret-1] + self.fretXs[fret]) / 2.0
-            r = self.markerDia / 2.0
-            painter.drawEllipse(QPointF(x, self.stringYs[string]), r, r)
-    def markRandomNote(self, noteFilter='All'):
-        """Mark a random note for display on the neck.
+        self.fretboard.markPitchClasses(pitchClasses, rootPc)
+        self.markerLayer.updateMarkers()
+    def markVoicing(self, voicing, rootPc=None):
+        """Mark the notes of a chord voicing for display.
 
-        noteFilter -- one of:
-                      * 'All', any note is okay
-                      * 'Natural', no sharps or flats
-                      * 'Markers', only open notes or notes on neck markers
-
-        Does not call update. Return the note selected.
+        See: Fretboard.markVoicing(). Only changed markers are updated.
+        Return None.
         """
-        while True:
-            noteName = choice(NOTES)
-            # no flats allowed
-            if noteFilter == 'Natural' and 'b' in noteName:
-                continue
-            string = randrange(self.nStrings)
-            # try to get a little more even distribution of the note placement
-            if randrange(10) % 2 == 0:
-                startFret = 0
-            else:
-                startFret = randrange(self.nFrets)
-            try:
-                # find the first noteName on string, starting at startFret
-                idx = self.allNotes[string][startFret:].index(noteName)
-            except ValueError:
-                continue
-            fret = idx + startFret
-            # only open notes or notes on markers
-            if noteFilter == 'Markers':
-                if fret not in [0, 3, 5, 7, 9, 12, 15, 17, 19, 21, 24]:
-                    continue
-            self.markedNotes = [(string, fret, False)]
-            break
-        return noteName
+        self.fretboard.markVoicing(voicing, rootPc)
+        self.markerLayer.updateMarkers()
     def markAll(self, noteName):
         """Mark every position of noteName for display.
 
-        noteName -- see: checkNoteName()
-        
-        Does not call update. Return None.
+        See: Fretboard.markAll(). Only changed markers are updated. Return
+        None.
         """
-        noteName = self.checkNoteName(noteName)
-        self.markedNotes = []
-        for string, stringNotes in enumerate(self.allNotes):
-            for fret, note in enumerate(stringNotes):
-                if note == noteName:
-                    self.markedNotes.append((string, fret, False))
+        self.fretboard.markAll(noteName)
+        self.markerLayer.updateMarkers()
     def markScale(self, scaleName, keyName):
         """Mark the scale in the given key.
 
-        scaleName -- a key found in INTERVALS
-        keyName -- see: checkNoteName()
+        See: Fretboard.markScale(). Only changed markers are updated. Raise
+        Exception if either scaleName or keyName is unknown. Return None.
+        """
+        self.fretboard.markScale(scaleName, keyName)
+        self.markerLayer.updateMarkers()
+    def setMarkedNotes(self, markedNotes):
+        """Mark notes for display.
+
+        See: Fretboard.setMarkedNotes(). Only changed markers are updated.
+        Return None.
+        """
+        self.fretboard.setMarkedNotes(markedNotes)
+        self.markerLayer.updateMarkers()
+    def setMarks(self, marks):
+        """Mark precomputed notes for display.
+
+        See: Fretboard.setMarks(). Only changed markers are updated. Return
+        None.
+        """
+        self.fretboard.setMarks(marks)
+        self.markerLayer.updateMarkers()
+    def compare(self, marksA, marksB):
+        """Overlay two markings in distinct colors.
 
-        Does not call update(). Raise Exception if either scaleName or keyName
-        is unknown. Return None.
+        See: Fretboard.compare(). Only changed markers are updated. Return
+        None.
         """
-        try:
-            keyName = self.checkNoteName(keyName)
-        except:
-            raise Exception('Unknown key name: {}'.format(repr(keyName)))
-        intervals = INTERVALS.get(scaleName, None)
-        if intervals is None:
-            raise Exception('Unknown scale name: {}'.format(repr(scaleName)))
-        self.markedNotes = []
-        idx = NOTES.index(keyName)
-        shiftedNotes = listRot(NOTES, -idx)
-        notes = [shiftedNotes[0]]
-        i = 0
-        for ii in intervals[:-1]:
-            i = i + ii
-            notes.append(shiftedNotes[i])
-        self.markedNotes = []
-        for name in notes:
-            noteName = self.checkNoteName(name)
-            for string, stringNotes in enumerate(self.allNotes):
-                for fret, note in enumerate(stringNotes):
-                    if note == noteName:
-                        self.markedNotes.append((string, fret,
-                                                 note == keyName))
+        self.fretboard.compare(marksA, marksB)
+        self.markerLayer.updateMarkers()
     def checkNoteName(self, noteName):
-        """Ensure noteName is valid.
+        """See: fretboard.checkNoteName()
+        """
+        return checkNoteName(noteName)
+
+
+class MarkerLayer(QGraphicsItem):
+    """The marked notes of a Neck, drawn on their own cached layer.
 
-        A valid note is one found in the global NOTES or in the keys of the
-        global dict SHARP2FLAT.
+    The layer is a child of the neck, so it is mirrored with it. It is only
+    re-rendered when the marking changes, and then only where markers were
+    added or removed.
+
+    A comparison, see: Fretboard.compare(), shows the shared positions and
+    those of only one marking in their own colors, root notes outlined.
+    """
+    rootPen = QPen(QColor(255, 0, 0))
+    rootBrush = QBrush(QColor(255, 0, 0))
+    notePen = QPen(QColor(0, 0, 0))
+    noteBrush = QBrush(QColor(0, 0, 0))
+    # comparison colors: shared, only in A, only in B
+    compareBrushes = [QBrush(QColor(0, 0, 0)), QBrush(QColor(0, 90, 220)),
+                      QBrush(QColor(0, 160, 60))]
+    compareRootPen = QPen(QColor(255, 0, 0), .04)
+    def __init__(self, neck):
+        """Initialize the marker layer.
 
-        Return a valid note name or raise Exception if invalid.
+        neck -- Neck, the parent item
         """
-        if noteName not in NOTES:
-            noteName = SHARP2FLAT.get(noteName)
-            if noteName is None:
-                raise Exception("Illegal note {}".format(repr(noteName)))
-        return noteName
-    
+        super(MarkerLayer, self).__init__(neck)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.neck = neck
+        # the Marks last drawn, see: _layers()
+        self.paintedLayers = ()
+    def boundingRect(self):
+        return self.neck.boundingRect()
+    def _layers(self):
+        """Return the Marks that decide how each position is drawn.
+        """
+        fretboard = self.neck.fretboard
+        if fretboard.comparison is not None:
+            return fretboard.comparison
+        return (fretboard.marks,)
+    def updateMarkers(self, bAll=False):
+        """Invalidate the markers that changed since the last call.
+
+        bAll -- bool, if True invalidate the whole layer, e.g. after the neck
+                geometry changed
+
+        Return None.
+        """
+        layers = self._layers()
+        if bAll:
+            self.update()
+        elif len(layers) == len(self.paintedLayers):
+            for new, old in zip(layers, self.paintedLayers):
+                for string, fret in new.changed(old):
+                    self.update(self.neck.markerRect(string, fret))
+        else:
+            # the colors change where anything is or was marked
+            changed = None
+            for marks in layers + self.paintedLayers:
+                changed = marks if changed is None else changed | marks
+            for string, fret in changed:
+                self.update(self.neck.markerRect(string, fret))
+        self.paintedLayers = layers
+    def paint(self, painter, option, widget):
+        """Draw the marked notes of the neck in the exposed rect.
+
+        Below DETAIL_LOD the markers have no outline. Return None.
+        """
+        neck = self.neck
+        r = neck.markerDia / 2.0
+        rect = option.exposedRect
+        if rect.isEmpty():
+            rect = self.boundingRect()
+        bDetail = (option.levelOfDetailFromTransform(painter.worldTransform())
+                   >= DETAIL_LOD)
+        fretboard = neck.fretboard
+        if fretboard.comparison is None:
+            marks = fretboard.marks
+            roots = marks.rootMarks()
+            # draw root notes on top in a different color
+            groups = [(marks - roots, self.notePen, self.noteBrush, None),
+                      (roots, self.rootPen, self.rootBrush, None)]
+        else:
+            a, b = fretboard.comparison
+            rootPen = self.compareRootPen if bDetail else None
+            groups = [(marks, qt.NoPen, brush, rootPen)
+                      for marks, brush in zip([a & b, a - b, b - a],
+                                              self.compareBrushes)]
+        for marks, pen, brush, rootPen in groups:
+            painter.setPen(pen if bDetail else qt.NoPen)
+            painter.setBrush(brush)
+            for string, fret in marks:
+                markerRect = neck.markerRect(string, fret)
+                if not markerRect.intersects(rect):
+                    continue
+                if rootPen is not None:
+                    painter.setPen(rootPen if marks.isRoot(string, fret)
+                                   else qt.NoPen)
+                painter.drawEllipse(markerRect.center(), r, r)
@@ -8,11 +8,12 @@ Monday, August 26 2013
 
 import sys
 
-from PyQt4.QtCore import *
-from PyQt4.QtGui import *
+from PyQt4.QtGui import (QApplication, QCheckBox, QComboBox, QGridLayout,
+                         QGroupBox, QLabel, QSpinBox, QVBoxLayout)
 from PyQt4.QtCore import Qt as qt
 
 from util import TUNINGS
+from fretboard import MIN_FRETS, MAX_FRETS
 
 
 class NeckConfigWidget(QGroupBox):
@@ -33,8 +34,8 @@ class NeckConfigWidget(QGroupBox):
         fretsLabel = QLabel('Frets')
         self.fretsSpinBox = QSpinBox()
         self.fretsSpinBox.setValue(nFrets)
-        self.fretsSpinBox.setMinimum(2)
-        self.fretsSpinBox.setMaximum(24)
+        self.fretsSpinBox.setMinimum(MIN_FRETS)
+        self.fretsSpinBox.setMaximum(MAX_FRETS)
         self.leftyCheckBox = QCheckBox('Lefty?')
         self.leftyCheckBox.setChecked(lefty)
         gLayout = QGridLayout()
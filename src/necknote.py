@@ -9,18 +9,48 @@ selected scales.
 Saturday, August 24 2013
 """
 
-import re
+from __future__ import print_function
+from timeit import default_timer
+# as early as possible, for the startup time report
+_startTime = default_timer()
+
 import sys
+import getpass
+from time import time
 
-from PyQt4.QtCore import *
-from PyQt4.QtGui import *
+from PyQt4.QtCore import QSize, QTimer, SIGNAL
+from PyQt4.QtGui import (QAction, QActionGroup, QApplication, QColor, QFont,
+                         QGraphicsScene, QGraphicsSimpleTextItem,
+                         QGraphicsView, QGridLayout, QMainWindow, QPainter,
+                         QPushButton, QWidget)
 from PyQt4.QtCore import Qt as qt
 
-from util import UNI2ASC, INTERVALS, NOTES, SHARP2FLAT
+from util import (UNI2ASC, ASC2UNI, INTERVALS, CHORDS, NOTES, SHARP2FLAT,
+                  TUNINGS, parseTuning)
 from neck import Neck
 from noteguess import NoteGuessWidget
 from neckcfg import NeckConfigWidget
 from scales import ScaleWidget
+from drill import StatsStore, DrillScheduler
+from sessionlog import SessionLog
+from prefetch import ScalePrefetcher
+from latency import LatencyProbe
+import catalogs
+import fingering
+from chords import bestVoicings
+
+# seconds from start to the first paint of the neck, see: App
+STARTUP_BUDGET = 0.5
+# voicings of a chord to step through, see: AppWindow.onChordPicked()
+CHORD_VOICINGS = 8
+
+def optionValue(argv, name):
+    """Return the value following the option name in argv or None.
+    """
+    if name in argv[:-1]:
+        return argv[argv.index(name) + 1]
+    return None
+
 
 class Scene(QGraphicsScene):
     def __init__(self, parent=None):
@@ -28,40 +58,501 @@ class Scene(QGraphicsScene):
         
         
 class View(QGraphicsView):
-    def __init__(self, scene, parent=None):
+    """Show the main neck and, below it, any number of necks to compare.
+
+    Necks with the same string and fret counts share their geometry, and
+    those with the same tuning share their note tables, see: Neck._updatePP()
+    and Fretboard.updateNotes().
+
+    The wheel zooms in about the mouse pointer, dragging pans and a double
+    click fits the necks again. While zoomed in, the item caches are off so
+    only the visible frets are painted.
+    """
+    # space between compared necks, in string spacings
+    neckGap = 3.0
+    # size of the neck labels
+    labelScale = 0.04
+    # largest zoom, relative to the fitted necks
+    maxZoom = 16.0
+    def __init__(self, scene, probe=None, parent=None):
+        """Initialize the view.
+
+        scene -- Scene
+        probe -- LatencyProbe or None, finished repaints end its actions and
+                 its results are shown as an overlay when it is enabled
+        parent -- QWidget or None
+        """
         super(View, self).__init__(parent)
+        if probe is None:
+            probe = LatencyProbe()
+        self.probe = probe
+        self.bPainted = False
         self.setRenderHints(QPainter.Antialiasing)
-        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(qt.ScrollBarAlwaysOff)
         self.setScene(scene)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        # 1.0 is fitted, see: fitNeck()
+        self.zoom = 1.0
         self.neck = Neck()
         self.scene().addItem(self.neck)
+        # compared necks below self.neck and the labels of all necks
+        self.necks = []
+        self.labels = []
+        self.bLeftHanded = False
+    def setComparison(self, labels):
+        """Show a neck below the main neck for each label.
+
+        labels -- list of strings, an empty list shows the main neck alone
+
+        Existing necks and labels are reused, a label only changes if its
+        text does. The caller configures and marks the necks then calls
+        layoutNecks() or placeLabels(). Return the list of compared necks.
+        """
+        scene = self.scene()
+        while len(self.necks) > len(labels):
+            scene.removeItem(self.necks.pop())
+        while len(self.necks) < len(labels):
+            neck = Neck()
+            neck.setLeftHanded(self.bLeftHanded)
+            scene.addItem(neck)
+            self.necks.append(neck)
+        texts = [''] + labels if labels else []
+        while len(self.labels) > len(texts):
+            scene.removeItem(self.labels.pop())
+        while len(self.labels) < len(texts):
+            label = QGraphicsSimpleTextItem()
+            label.setScale(self.labelScale)
+            scene.addItem(label)
+            self.labels.append(label)
+        for label, text in zip(self.labels, texts):
+            if label.text() != text:
+                label.setText(text)
+        return self.necks
+    def setMainLabel(self, text):
+        """Set the label of the main neck, shown only when comparing.
+        """
+        if self.labels and self.labels[0].text() != text:
+            self.labels[0].setText(text)
+    def layoutNecks(self):
+        """Stack the necks and place their labels, then fit them in view.
+
+        Call when necks are added or removed or their geometry changes, the
+        zoom is reset. Return None.
+        """
+        y = 0.0
+        for neck in [self.neck] + self.necks:
+            neck.setPos(0.0, y)
+            y += (neck.sceneBoundingRect().height()
+                  + Neck.stringSpacing * self.neckGap)
+        self.placeLabels()
+        self.fitNeck()
+    def placeLabels(self):
+        """Place each label left of its neck, e.g. after its text changed.
+
+        The zoom is kept. Return None.
+        """
+        for label, neck in zip(self.labels, [self.neck] + self.necks):
+            rect = neck.sceneBoundingRect()
+            labelRect = label.sceneBoundingRect()
+            label.setPos(rect.left() - labelRect.width() - Neck.nutThickness,
+                         rect.center().y() - labelRect.height() / 2.0)
+    def setLeftHanded(self, bValue):
+        """Mirror all necks, see: Neck.setLeftHanded().
+        """
+        self.bLeftHanded = bValue
+        for neck in [self.neck] + self.necks:
+            neck.setLeftHanded(bValue)
+        self.layoutNecks()
     def fitNeck(self):
-        self.fitInView(self.neck, qt.KeepAspectRatio)
+        """Fit the necks in the view, the zoom is reset.
+        """
+        if self.necks:
+            rect = self.scene().itemsBoundingRect()
+        else:
+            rect = self.neck.sceneBoundingRect()
+        self.setSceneRect(rect)
+        self.fitInView(rect, qt.KeepAspectRatio)
+        self._setZoom(1.0)
+    def _setZoom(self, zoom):
+        """Record the zoom and cache the necks only when fitted.
+        """
+        self.zoom = zoom
+        for neck in [self.neck] + self.necks:
+            neck.setCached(zoom <= 1.0)
+    def wheelEvent(self, e):
+        """Zoom in or out about the mouse pointer.
+        """
+        zoom = min(max(self.zoom * 1.25 ** (e.delta() / 120.0), 1.0),
+                   self.maxZoom)
+        if zoom == self.zoom:
+            return
+        if zoom == 1.0:
+            self.fitNeck()
+            return
+        factor = zoom / self.zoom
+        self.scale(factor, factor)
+        self._setZoom(zoom)
+    def mouseDoubleClickEvent(self, e):
+        self.fitNeck()
     def sizeHint(self):
         return QSize(1600, 200)
     def resizeEvent(self, e):
-        """Fit the neck into the view.
+        """Fit the necks into the view, keeping the zoom.
         """
         super(View, self).resizeEvent(e)
+        zoom = self.zoom
         self.fitNeck()
+        if zoom > 1.0:
+            self.scale(zoom, zoom)
+            self._setZoom(zoom)
+    def paintEvent(self, e):
+        """Paint, then end the pending latency measurement.
+
+        Emit firstPaint() after the first paint.
+        """
+        super(View, self).paintEvent(e)
+        if not self.bPainted:
+            self.bPainted = True
+            self.emit(SIGNAL('firstPaint()'))
+        if self.probe.pending():
+            self.probe.end()
+            # show the result, this repaint does not end anything
+            QTimer.singleShot(0, self.viewport().update)
+    def drawForeground(self, painter, rect):
+        """Draw the latency overlay if the probe is enabled.
+        """
+        if not self.probe.bEnabled:
+            return
+        painter.save()
+        painter.resetTransform()
+        painter.setPen(QColor(0, 0, 160))
+        painter.setFont(QFont('Monospace', 8))
+        lineHeight = painter.fontMetrics().lineSpacing()
+        for n, line in enumerate(self.probe.overlayLines()):
+            painter.drawText(5, lineHeight * (n + 1), line)
+        painter.restore()
         
 
 class AppWindow(QMainWindow):
-    def __init__(self, parent=None):
+    def __init__(self, bLatency=False, parent=None):
+        """Initialize the main window.
+
+        bLatency -- bool, if True time user actions, see: LatencyProbe
+        parent -- QWidget or None
+        """
         super(AppWindow, self).__init__(parent)
         self.setWindowTitle("GNeck")
         self.widget = QWidget(self)
         self.scene = Scene(self)
-        self.view = View(self.scene)
+        self.probe = LatencyProbe(bLatency)
+        self.view = View(self.scene, self.probe)
         self.gLayout = QGridLayout(self.widget)
         self.gLayout.addWidget(self.view, 0, 0, 1, 3)
         self.gLayout.setRowStretch(0, 1)
+        self.gLayout.setColumnStretch(1, 2)
+        self.setCentralWidget(self.widget)
+        self._createViewMenu()
+        self._createChordMenu()
+        self._createSoundMenu()
+        # see: _updateComparison()
+        self.compareMode = 'single'
+        self.statsStore = None
+        self.sessionLog = None
+        self.prefetcher = None
+        self.scaleWidget = None
+        self.noteGuessWidget = None
+        # the drill note, see: _nextNote()
+        self.curNote = None
+        # time the current drill note was shown, None once answered
+        self.noteShownTime = None
+        # seconds from start to the first neck paint and to the panels
+        self.firstPaintTime = None
+        self.readyTime = None
+        # the panels are built once the neck is on screen
+        self.connect(self.view, SIGNAL('firstPaint()'), self._onFirstPaint)
+    def _onFirstPaint(self):
+        self.firstPaintTime = default_timer() - _startTime
+        QTimer.singleShot(0, self._createPanels)
+    def _createPanels(self):
+        """Create the side panels and the drill statistics.
+
+        Emit ready() when done.
+        """
         self.gLayout.addWidget(self._createNeckCfgWidget(), 1, 0)
         self.gLayout.addWidget(self._createScaleWidget(), 1, 1)
-        self.gLayout.setColumnStretch(1, 2)
         self.gLayout.addWidget(self._createNoteGuessWidget(), 1, 2)
-        self.setCentralWidget(self.widget)
+        self.statsStore = StatsStore()
+        self.sessionLog = SessionLog()
+        self.prefetcher = ScalePrefetcher()
+        self.scheduler = DrillScheduler(self.view.neck.fretboard,
+                                        self.statsStore, getpass.getuser())
+        self.readyTime = default_timer() - _startTime
+        self.emit(SIGNAL('ready()'))
+    def _createViewMenu(self):
+        menu = self.menuBar().addMenu('&View')
+        group = QActionGroup(self)
+        for mode, text in [('single', 'Single Neck'),
+                           ('tunings', 'Scale Across Tunings'),
+                           ('keys', 'Scale Across Keys')]:
+            action = QAction(text, group)
+            action.setCheckable(True)
+            action.setChecked(mode == 'single')
+            self.connect(action, SIGNAL('triggered()'),
+                         lambda mode=mode: self.onCompareModeChanged(mode))
+            menu.addAction(action)
+        menu.addSeparator()
+        action = QAction('Compare With This Scale', self)
+        action.setCheckable(True)
+        self.connect(action, SIGNAL('toggled(bool)'), self.onCompareToggled)
+        menu.addAction(action)
+        # (scaleName, keyName) overlaid on the current scale or None
+        self.comparedScale = None
+        menu.addSeparator()
+        group = QActionGroup(self)
+        for kind, text in [(None, 'Whole Neck'),
+                           ('3nps', '3 Notes per String'),
+                           ('box', 'Position Boxes')]:
+            action = QAction(text, group)
+            action.setCheckable(True)
+            action.setChecked(kind is None)
+            self.connect(action, SIGNAL('triggered()'),
+                         lambda kind=kind: self.onPatternKindChanged(kind))
+            menu.addAction(action)
+        action = QAction('Next Pattern', self)
+        action.setShortcut(']')
+        self.connect(action, SIGNAL('triggered()'),
+                     lambda: self.onPatternStep(1))
+        menu.addAction(action)
+        action = QAction('Previous Pattern', self)
+        action.setShortcut('[')
+        self.connect(action, SIGNAL('triggered()'),
+                     lambda: self.onPatternStep(-1))
+        menu.addAction(action)
+        # scales are shown one position pattern at a time if not None, see:
+        # fingering.KINDS
+        self.patternKind = None
+        self.patternIndex = 0
+    def onCompareToggled(self, bValue):
+        """Keep the current scale to compare with the next scales picked.
+
+        bValue -- bool, False to stop comparing
+
+        Shared notes are black, notes only in the picked scale blue and
+        notes only in the kept scale green. Called when Compare With This
+        Scale is toggled.
+        """
+        self.comparedScale = None
+        self.statusBar().clearMessage()
+        if self.scaleWidget is None:
+            return
+        scaleName = self.scaleWidget.curScale()
+        if scaleName not in INTERVALS:
+            return
+        keyName = self.scaleWidget.curKey()
+        if bValue:
+            self.comparedScale = (scaleName, keyName)
+            self.statusBar().showMessage(
+                'Comparing with {} {}: shared notes black, only in it'
+                ' green'.format(ASC2UNI[keyName], scaleName))
+        self._markScale(scaleName, keyName)
+    def onPatternKindChanged(self, kind):
+        """Show scales on the whole neck or one pattern at a time.
+
+        kind -- None or see: fingering.KINDS
+
+        Called when a View menu item is selected.
+        """
+        self.patternKind = kind
+        self.patternIndex = 0
+        self._remarkScale()
+    def onPatternStep(self, step):
+        """Show the next or previous pattern of the current scale.
+
+        step -- integer, 1 for the next pattern up the neck, -1 for the one
+                below
+
+        Called when Next or Previous Pattern is selected.
+        """
+        if self.patternKind is None:
+            return
+        self.patternIndex += step
+        self._remarkScale()
+    def _remarkScale(self):
+        """Mark the current scale again, if one is picked.
+        """
+        if (self.scaleWidget is None
+            or self.scaleWidget.curScale() not in INTERVALS):
+            return
+        self.probe.begin('pattern')
+        self._markScale(self.scaleWidget.curScale(),
+                        self.scaleWidget.curKey())
+        self._play(self.view.neck.fretboard.markedPitches(), True)
+    def _createChordMenu(self):
+        menu = self.menuBar().addMenu('&Chord')
+        for chordName in sorted(CHORDS,
+                                key=lambda x: (len(CHORDS[x]), x)):
+            action = QAction(chordName, self)
+            self.connect(action, SIGNAL('triggered()'),
+                         lambda chordName=chordName:
+                         self.onChordPicked(chordName))
+            menu.addAction(action)
+        menu.addSeparator()
+        action = QAction('Next Voicing', self)
+        action.setShortcut('.')
+        self.connect(action, SIGNAL('triggered()'),
+                     lambda: self.onVoicingStep(1))
+        menu.addAction(action)
+        action = QAction('Previous Voicing', self)
+        action.setShortcut(',')
+        self.connect(action, SIGNAL('triggered()'),
+                     lambda: self.onVoicingStep(-1))
+        menu.addAction(action)
+        # the chord shown and its voicings, best first, see: onChordPicked()
+        self.chordName = None
+        self.voicings = []
+        self.voicingIndex = 0
+    def onChordPicked(self, chordName):
+        """Mark the best voicing of a chord in the current key.
+
+        chordName -- string, a key found in CHORDS
+
+        Called when a Chord menu item is selected.
+        """
+        if self.scaleWidget is None:
+            return
+        self.probe.begin('chord')
+        keyName = self.scaleWidget.curKey()
+        self.chordName = chordName
+        self.voicings = bestVoicings(self.view.neck.fretboard, keyName,
+                                     chordName, CHORD_VOICINGS)
+        self.probe.mark('bestVoicings')
+        self.voicingIndex = 0
+        self._markVoicing(keyName)
+    def onVoicingStep(self, step):
+        """Mark the next or previous best voicing of the chord shown.
+
+        step -- integer, 1 for the next worse voicing, -1 for the next
+                better one
+
+        Called when Next or Previous Voicing is selected.
+        """
+        if not self.voicings:
+            return
+        self.probe.begin('voicing')
+        self.voicingIndex += step
+        self._markVoicing(self.scaleWidget.curKey())
+    def _markVoicing(self, keyName):
+        """Mark the current voicing of self.voicings and play it.
+        """
+        if not self.voicings:
+            self.statusBar().showMessage('No playable {} {} voicing'.format(
+                ASC2UNI[keyName], self.chordName))
+            return
+        n = self.voicingIndex % len(self.voicings)
+        score, voicing = self.voicings[n]
+        neck = self.view.neck
+        neck.markVoicing(voicing,
+                         NOTES.index(SHARP2FLAT.get(keyName, keyName)))
+        self.probe.mark('markVoicing')
+        self.statusBar().showMessage(
+            '{} {} voicing {} of {}: {}'.format(
+                ASC2UNI[keyName], self.chordName, n + 1, len(self.voicings),
+                ' '.join('x' if fret is None else str(fret)
+                         for fret in voicing)))
+        self._play(neck.fretboard.markedPitches())
+    def _createSoundMenu(self):
+        menu = self.menuBar().addMenu('&Sound')
+        action = QAction('Play Notes', self)
+        action.setCheckable(True)
+        self.connect(action, SIGNAL('toggled(bool)'), self.onSoundToggled)
+        menu.addAction(action)
+        self.soundAction = action
+        action = QAction('Listen for Answers', self)
+        action.setCheckable(True)
+        self.connect(action, SIGNAL('toggled(bool)'), self.onListenToggled)
+        menu.addAction(action)
+        self.listenAction = action
+        # see: onSoundToggled() and onListenToggled()
+        self.player = None
+        self.audioOutput = None
+        self.listener = None
+        self.audioInput = None
+    def onSoundToggled(self, bValue):
+        """Play the drill notes and scale runs or stay silent.
+
+        bValue -- bool, True to play
+
+        The samples of the whole neck are rendered here, so playing a note
+        later only queues it. Called when Play Notes is toggled.
+        """
+        if not bValue:
+            if self.player is not None:
+                self.player.stop()
+            return
+        if self.player is None:
+            try:
+                import sound
+                self.player = sound.Player()
+                self.audioOutput = sound.audioOutput(self.player, self)
+            except Exception as e:
+                self.statusBar().showMessage('No sound: {}'.format(e))
+                self.player = None
+                self.soundAction.setChecked(False)
+                return
+        self._preloadSound()
+    def onListenToggled(self, bValue):
+        """Take drill answers from notes played on an instrument or not.
+
+        bValue -- bool, True to listen
+
+        A detected note is handled like a press of its Note button. Called
+        when Listen for Answers is toggled.
+        """
+        if not bValue:
+            if self.audioInput is not None:
+                self.audioInput.stop()
+                self.audioInput = None
+            return
+        try:
+            import pitch
+            if self.listener is None:
+                self.listener = pitch.NoteListener(self.onNotePlayed)
+            self.listener.reset()
+            self.audioInput = pitch.audioInput(self.listener, self)
+        except Exception as e:
+            self.statusBar().showMessage('No audio input: {}'.format(e))
+            self.audioInput = None
+            self.listenAction.setChecked(False)
+    def onNotePlayed(self, noteName, pitch):
+        """Answer the drill with a played note.
+
+        noteName -- string, see: NOTES
+        pitch -- integer, MIDI pitch
+
+        Notes heard while the app itself plays are ignored. Called by the
+        note listener.
+        """
+        if self.curNote is None or self.noteGuessWidget is None:
+            return
+        if self.player is not None and not self.player.bIdle():
+            return
+        self.onNoteGuessPress(noteName)
+    def _preloadSound(self):
+        if self.player is not None:
+            self.player.preloadFretboard(self.view.neck.fretboard)
+    def _play(self, pitches, bRun=False):
+        """Play MIDI pitches if sound is on, together or one by one.
+        """
+        if self.player is None or not self.soundAction.isChecked():
+            return
+        self.player.stop()
+        if bRun:
+            self.player.playSequence(pitches)
+        else:
+            for pitch in pitches:
+                self.player.play(pitch)
     def _createNeckCfgWidget(self):
         w = NeckConfigWidget()
         self.connect(w.tuningCombo, SIGNAL('activated(const QString&)'),
@@ -77,8 +568,7 @@ class AppWindow(QMainWindow):
         self.connect(w.keyComboBox, SIGNAL('activated(const QString&)'),
                      lambda keyName
                      : self.onScaleKeyChanged(UNI2ASC[unicode(keyName)]))
-        self.connect(w.scaleListView,
-                     SIGNAL('currentTextChanged(const QString&)'),
+        self.connect(w, SIGNAL('scaleChanged(const QString&)'),
                      self.onScaleChanged)
         return w
     def _createNoteGuessWidget(self):
@@ -93,33 +583,146 @@ class AppWindow(QMainWindow):
                              lambda noteName=UNI2ASC[unicode(txt)]
                              : self.onNoteGuessPress(noteName))
         return w
+    def onCompareModeChanged(self, mode):
+        """Show the main neck alone or compare the current scale.
+
+        mode -- string, 'single', 'tunings' for one neck per tuning in
+                TUNINGS or 'keys' for one neck per other key
+
+        Called when a View menu item is selected.
+        """
+        self.probe.begin('compare')
+        self.compareMode = mode
+        self._updateComparison(True)
+        self.probe.mark('updateComparison')
+    def _updateComparison(self, bLayout=False):
+        """Configure, mark and lay out the compared necks.
+
+        bLayout -- bool, True if the neck geometry or the compare mode
+                   changed
+
+        The necks are only laid out and fitted again, resetting the zoom,
+        if bLayout is True or necks were added or removed. Return None.
+        """
+        view = self.view
+        main = view.neck
+        if (self.compareMode == 'single' or self.scaleWidget is None
+            or self.scaleWidget.curScale() not in INTERVALS):
+            if bLayout or view.necks:
+                view.setComparison([])
+                view.layoutNecks()
+            return
+        scaleName = self.scaleWidget.curScale()
+        keyName = self.scaleWidget.curKey()
+        if self.compareMode == 'tunings':
+            configs = [(tuning, parseTuning(tuning), keyName)
+                       for tuning, tip in TUNINGS
+                       if parseTuning(tuning) != list(main.tuning)]
+        else:
+            start = NOTES.index(SHARP2FLAT.get(keyName, keyName))
+            configs = [(ASC2UNI[NOTES[(start + n) % 12]], main.tuning,
+                        NOTES[(start + n) % 12]) for n in range(1, 12)]
+        nNecks = len(view.necks)
+        necks = view.setComparison([label for label, t, k in configs])
+        for neck, (label, tuning, key) in zip(necks, configs):
+            # a new marking only repaints the markers that changed
+            if (list(neck.tuning) != list(tuning)
+                or neck.nFrets != main.nFrets):
+                neck.setTuning(tuning)
+                neck.setFretCount(main.nFrets)
+                neck.updateAll()
+            neck.markScale(scaleName, key)
+        if self.compareMode == 'tunings':
+            view.setMainLabel(''.join(main.tuning))
+        else:
+            view.setMainLabel(ASC2UNI[keyName])
+        if bLayout or len(necks) != nNecks:
+            view.layoutNecks()
+        else:
+            view.placeLabels()
     def onTuningChanged(self, tuning):
-        t = [SHARP2FLAT.get(x, x)
-             for x in re.findall(r'[A-G][#b]?', str(tuning))]
-        self.view.neck.setTuning(t)
+        self.probe.begin('tuning')
+        self.view.neck.setTuning(parseTuning(str(tuning)))
         self.view.neck.updateAll()
-        self.view.fitNeck()
+        self.probe.mark('updateAll')
+        if self.prefetcher is not None:
+            self.prefetcher.invalidate()
+        # the voicings were found for the old neck
+        self.voicings = []
+        self._preloadSound()
+        self._updateComparison(True)
+        self.probe.mark('updateComparison')
     def onLeftyChanged(self, bValue):
-        """Change the orientation of the neck.
+        """Change the orientation of the necks.
 
-        value -- True to show a left-handed neck, False otherwise
+        value -- True to show left-handed necks, False otherwise
 
         Called when Lefty check box is clicked.
         """
-        self.view.neck.setLeftHanded(bValue)
-        self.view.fitNeck()
+        self.view.setLeftHanded(bValue)
+    def _markScale(self, scaleName, keyName):
+        """Mark a scale on the neck from the prefetched markings.
+
+        The scale is overlaid with the compared scale, if any. Otherwise
+        only the current position pattern is marked, if patterns are shown.
+
+        Then prefetch the scales the user is likely to pick next. Return
+        None.
+        """
+        fretboard = self.view.neck.fretboard
+        marks = self.prefetcher.get(fretboard, scaleName, keyName)
+        if self.comparedScale is None and self.patternKind is not None:
+            patterns = fingering.patterns(fretboard, scaleName, keyName,
+                                          self.patternKind)
+            if patterns:
+                pattern = patterns[self.patternIndex % len(patterns)]
+                marks = pattern.marks(len(fretboard.allNotes))
+                self.statusBar().showMessage(
+                    'Pattern {} of {}, from degree {}, frets {} to {}'.format(
+                        self.patternIndex % len(patterns) + 1, len(patterns),
+                        pattern.degree, pattern.lowFret, pattern.highFret))
+            else:
+                self.statusBar().showMessage('No playable pattern')
+        if self.comparedScale is None:
+            self.view.neck.setMarks(marks)
+        else:
+            self.view.neck.compare(
+                marks, self.prefetcher.get(fretboard, *self.comparedScale))
+        self.probe.mark('markScale')
+        self.prefetcher.prefetch(fretboard, self.scaleWidget.neighbours())
     def onScaleKeyChanged(self, keyName):
-        self.view.neck.markScale(self.scaleWidget.curScale(), str(keyName))
-        self.scene.update()
+        self.probe.begin('scaleKey')
+        self._markScale(self.scaleWidget.curScale(), str(keyName))
+        self._play(self.view.neck.fretboard.markedPitches(), True)
+        self._updateComparison()
+        self.probe.mark('updateComparison')
     def onScaleChanged(self, scaleName):
-        self.view.neck.markScale(str(scaleName), self.scaleWidget.curKey())
-        self.scene.update()
+        self.probe.begin('scale')
+        self._markScale(str(scaleName), self.scaleWidget.curKey())
+        self._play(self.view.neck.fretboard.markedPitches(), True)
+        self._updateComparison()
+        self.probe.mark('updateComparison')
     def onNextNote(self):
-        """Display the next random note on the fretboard
+        """Display the next note to drill on the fretboard
+
+        Called when the Next Note button is pressed.
         """
-        self.curNote \
-            = self.view.neck.markRandomNote(self.noteGuessWidget.noteFilter())
-        self.scene.update()
+        self.probe.begin('nextNote')
+        self._nextNote()
+    def _nextNote(self):
+        """Mark the next note to drill, picked by the drill scheduler.
+        """
+        noteFilter = self.noteGuessWidget.noteFilter()
+        string, fret = self.scheduler.nextPosition(noteFilter)
+        self.curNote = self.view.neck.markPosition(string, fret)
+        self.probe.mark('markPosition')
+        self.sessionLog.setSession(self.scheduler.user,
+                                   self.scheduler.tuningKey())
+        self.sessionLog.show(string, fret, self.curNote, noteFilter)
+        # a crash loses at most the record being written, see: SessionLog
+        self.sessionLog.flush()
+        self._play([self.view.neck.fretboard.pitch(string, fret)])
+        self.noteShownTime = time()
     def onNoteGuessPress(self, noteName):
         """Check if the user guessed the right note.
 
@@ -129,13 +732,24 @@ class AppWindow(QMainWindow):
         nextNote(), else show all the positions of the current note on the
         neck.
 
-        Called when a Note button is pressed.
+        Called when a Note button is pressed. Does nothing until a drill
+        note is shown.
         """
-        if SHARP2FLAT.get(noteName, noteName) == self.curNote:
-            self.onNextNote()
+        if self.curNote is None:
+            return
+        self.probe.begin('noteGuess')
+        bCorrect = SHARP2FLAT.get(noteName, noteName) == self.curNote
+        self.sessionLog.guess(noteName, bCorrect)
+        self.sessionLog.flush()
+        if self.noteShownTime is not None:
+            # only the first guess counts
+            self.scheduler.record(bCorrect, time() - self.noteShownTime)
+            self.noteShownTime = None
+        if bCorrect:
+            self._nextNote()
         else:
             self.view.neck.markAll(self.curNote)
-            self.scene.update()
+            self.probe.mark('markAll')
     def onFretCountChanged(self, frets):
         """Update the number of frets on the neck.
 
@@ -143,18 +757,65 @@ class AppWindow(QMainWindow):
 
         Called when the Fret spin box is changed.
         """
+        self.probe.begin('frets')
         self.view.neck.setFretCount(frets)
         self.view.neck.updateAll()
-        self.view.fitNeck()
+        self.probe.mark('updateAll')
+        if self.prefetcher is not None:
+            self.prefetcher.invalidate()
+        # the voicings were found for the old neck
+        self.voicings = []
+        self._preloadSound()
+        self._updateComparison(True)
+        self.probe.mark('updateComparison')
+    def closeEvent(self, e):
+        """Commit the drill statistics and session log before closing.
+        """
+        if self.statsStore is not None:
+            self.statsStore.close()
+        if self.sessionLog is not None:
+            self.sessionLog.close()
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        super(AppWindow, self).closeEvent(e)
         
             
 class App(QApplication):
     def __init__(self, argv):
+        """Initialize the application.
+
+        argv -- command line
+                --latency times user actions, shows the results on the neck
+                and logs them, see: LatencyProbe
+                --startup-time prints the startup times and quits, the exit
+                status is 1 if the first paint took longer than
+                STARTUP_BUDGET
+                --tunings FILE and --scales FILE add user catalogs, see:
+                catalogs.py
+        """
+        bLatency = '--latency' in argv
+        bStartupTime = '--startup-time' in argv
+        catalogs.install(optionValue(argv, '--tunings'),
+                         optionValue(argv, '--scales'))
         super(App, self).__init__(argv)
-        self.appWindow = AppWindow()
+        self.appWindow = AppWindow(bLatency)
+        if bStartupTime:
+            self.connect(self.appWindow, SIGNAL('ready()'),
+                         self.reportStartupTime)
         self.appWindow.show()
+    def reportStartupTime(self):
+        """Print the startup times and quit.
+        """
+        w = self.appWindow
+        bOver = w.firstPaintTime > STARTUP_BUDGET
+        print('first paint {:.1f} ms, ready {:.1f} ms,'
+              ' budget {:.1f} ms: {}'.format(w.firstPaintTime * 1000.0,
+                                             w.readyTime * 1000.0,
+                                             STARTUP_BUDGET * 1000.0,
+                                             'OVER' if bOver else 'ok'))
+        self.exit(1 if bOver else 0)
         
 
 if __name__ == '__main__':
     app = App(sys.argv)
-    app.exec_()
+    sys.exit(app.exec_())
@@ -10,8 +10,8 @@ import os
 import sys
 import re
 
-from PyQt4.QtCore import *
-from PyQt4.QtGui import *
+from PyQt4.QtGui import (QGridLayout, QGroupBox, QHBoxLayout, QPushButton,
+                         QRadioButton, QVBoxLayout)
 from PyQt4.QtCore import Qt as qt
 
 from util import ASC2UNI
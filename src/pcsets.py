@@ -0,0 +1,161 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""pcsets.py
+
+Identify scales from notes. A set of pitch classes is a 12 bit mask, bit n
+is the note NOTES[n]. Every scale of a catalog in every key is indexed by
+its mask, so a query is a few dict look-ups instead of a scan.
+
+Saturday, October 17 2026
+"""
+
+from util import NOTES, INTERVALS, listRot, scalePitchClasses
+from fretboard import checkNoteName
+
+FULL_MASK = (1 << 12) - 1
+
+# Scales that, with their modes, extend INTERVALS. Name -> (intervals, mode
+# names). Mode n starts on degree n+1 of the scale.
+SCALE_FAMILIES = {
+    'Melodic Minor': ([2, 1, 2, 2, 2, 2, 1],
+                      ['Melodic Minor', 'Dorian b2', 'Lydian Augmented',
+                       'Lydian Dominant', 'Mixolydian b6', 'Locrian #2',
+                       'Altered']),
+    'Harmonic Minor': ([2, 1, 2, 2, 1, 3, 1],
+                       ['Harmonic Minor', 'Locrian #6', 'Ionian #5',
+                        'Dorian #4', 'Phrygian Dominant', 'Lydian #2',
+                        'Super Locrian bb7']),
+    'Harmonic Major': ([2, 2, 1, 2, 1, 3, 1],
+                       ['Harmonic Major', 'Dorian b5', 'Phrygian b4',
+                        'Lydian b3', 'Mixolydian b2', 'Lydian Augmented #2',
+                        'Locrian bb7']),
+    'Double Harmonic': ([1, 3, 1, 2, 1, 3, 1],
+                        ['Double Harmonic', 'Lydian #2 #6', 'Ultraphrygian',
+                         'Hungarian Minor', 'Oriental', 'Ionian #2 #5',
+                         'Locrian bb3 bb7']),
+    'Major Pentatonic': ([2, 2, 3, 2, 3],
+                         ['Major Pentatonic', 'Suspended Pentatonic',
+                          'Blues Minor Pentatonic', 'Blues Major Pentatonic',
+                          'Minor Pentatonic']),
+    'Hirajoshi': ([2, 1, 4, 1, 4],
+                  ['Hirajoshi', 'Iwato', 'Kumoi', 'Hon Kumoi', 'Chinese']),
+    'Whole Tone': ([2, 2, 2, 2, 2, 2], ['Whole Tone']),
+    'Diminished': ([2, 1, 2, 1, 2, 1, 2, 1],
+                   ['Diminished Whole Half', 'Diminished Half Whole']),
+    'Augmented': ([3, 1, 3, 1, 3, 1], ['Augmented', 'Augmented Inverse']),
+    'Bebop Dominant': ([2, 2, 1, 2, 2, 1, 1, 1], ['Bebop Dominant']),
+    'Bebop Major': ([2, 2, 1, 2, 1, 1, 2, 1], ['Bebop Major']),
+    'Neapolitan Major': ([1, 2, 2, 2, 2, 2, 1], ['Neapolitan Major']),
+    'Neapolitan Minor': ([1, 2, 2, 2, 1, 3, 1], ['Neapolitan Minor']),
+    'Enigmatic': ([1, 3, 2, 2, 2, 1, 1], ['Enigmatic']),
+    'Persian': ([1, 3, 1, 1, 2, 3, 1], ['Persian']),
+    'Prometheus': ([2, 2, 2, 3, 1, 2], ['Prometheus']),
+    'In Sen': ([1, 4, 2, 3, 2], ['In Sen']),
+    'Chromatic': ([1] * 12, ['Chromatic']),
+    }
+
+
+def pcMask(pitchClasses):
+    """Return the mask of an iterable of pitch classes 0 to 11.
+    """
+    mask = 0
+    for pc in pitchClasses:
+        mask |= 1 << pc
+    return mask
+def noteMask(noteNames):
+    """Return the mask of an iterable of note names.
+
+    noteNames -- see: checkNoteName()
+
+    Raise Exception if a note name is invalid.
+    """
+    return pcMask([NOTES.index(checkNoteName(n)) for n in noteNames])
+def markedMask(fretboard):
+    """Return the mask of the notes marked on a Fretboard or Neck.
+    """
+    return pcMask([NOTES.index(fretboard.allNotes[string][fret])
+                   for string, fret, root in fretboard.markedNotes])
+def maskPitchClasses(mask):
+    """Return the sorted list of pitch classes in mask.
+    """
+    return [pc for pc in range(12) if mask >> pc & 1]
+def supersets(mask):
+    """Generate every mask that contains mask, mask itself included.
+    """
+    free = FULL_MASK & ~mask
+    sub = free
+    while True:
+        yield mask | sub
+        if not sub:
+            break
+        sub = (sub - 1) & free
+def subsets(mask):
+    """Generate every mask contained in mask, mask itself included.
+    """
+    sub = mask
+    while True:
+        yield sub
+        if not sub:
+            break
+        sub = (sub - 1) & mask
+def catalog():
+    """Return the built-in scale catalog.
+
+    It holds INTERVALS and every mode of SCALE_FAMILIES.
+
+    Return a dict mapping scale names to intervals, see: INTERVALS.
+    """
+    result = dict(INTERVALS)
+    for intervals, modeNames in SCALE_FAMILIES.values():
+        for n, name in enumerate(modeNames):
+            result.setdefault(name, listRot(intervals, -n))
+    return result
+
+
+class ScaleIndex(object):
+    """Every scale of a catalog in every key, indexed by pitch class mask.
+    """
+    def __init__(self, scales=None):
+        """Build the index.
+
+        scales -- dict mapping scale names to intervals, see: INTERVALS. The
+                  default is catalog().
+        """
+        if scales is None:
+            scales = catalog()
+        # mask -> list of (scaleName, keyName)
+        self.index = {}
+        for name, intervals in scales.items():
+            for rootPc in range(12):
+                mask = pcMask(scalePitchClasses(rootPc, intervals))
+                self.index.setdefault(mask, []).append((name, NOTES[rootPc]))
+        for matches in self.index.values():
+            matches.sort()
+    def _collect(self, masks):
+        """Return the (scaleName, keyName) of every indexed mask in masks.
+
+        Smaller scales come first.
+        """
+        found = [mask for mask in masks if mask in self.index]
+        found.sort(key=lambda mask: (bin(mask).count('1'), mask))
+        result = []
+        for mask in found:
+            result.extend(self.index[mask])
+        return result
+    def matches(self, mask):
+        """Return every (scaleName, keyName) with exactly the notes of mask.
+        """
+        return list(self.index.get(mask, []))
+    def containing(self, mask):
+        """Return every (scaleName, keyName) that contains the notes of mask.
+
+        The closest fits, scales with the fewest notes, come first.
+        """
+        return self._collect(supersets(mask))
+    def containedIn(self, mask):
+        """Return every (scaleName, keyName) whose notes are all in mask.
+
+        Smaller scales come first.
+        """
+        return self._collect(subsets(mask))
@@ -0,0 +1,298 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""pitch.py
+
+Detect the notes played on an instrument, as an answer source for the note
+drill. Audio is fed in blocks of any size; a frame is analyzed every hop
+with the YIN method, using NumPy FFTs, so the cost per second of audio is
+fixed. A note is reported once it is stable for a few hops.
+
+Audio comes from the sound card through Qt, see: audioInput(), or from a
+recorded WAV file, see: readWav().
+
+usage: pitch.py [-h] [-t TUNING] [-n FRETS] FILE
+
+Saturday, October 17 2026
+"""
+
+from __future__ import print_function
+
+import sys
+import math
+import wave
+import argparse
+from timeit import default_timer
+
+import numpy as np
+
+from util import NOTES, parseTuning
+from sound import SAMPLE_RATE, A4_PITCH
+
+
+def pitchOf(freq):
+    """Return the (MIDI pitch, cents off) of a frequency in Hz.
+
+    cents is from -50 to 50.
+    """
+    exact = A4_PITCH + 12.0 * math.log(freq / 440.0, 2)
+    pitch = int(round(exact))
+    return pitch, (exact - pitch) * 100.0
+def noteNameOf(pitch):
+    """Return the note name of a MIDI pitch, see: NOTES.
+    """
+    # MIDI 21 is A0, NOTES starts at A
+    return NOTES[(pitch - 21) % 12]
+
+
+class PitchDetector(object):
+    """Estimate the fundamental frequency of a frame of samples.
+    """
+    def __init__(self, rate=SAMPLE_RATE, frameSize=2048, minFreq=60.0,
+                 maxFreq=1400.0, threshold=0.15, minLevel=0.01):
+        """Initialize the detector.
+
+        rate -- integer, sample rate
+        frameSize -- integer, samples analyzed at once, must hold two
+                     periods of minFreq
+        minFreq, maxFreq -- float, Hz, range of fundamentals searched
+        threshold -- float, YIN aperiodicity accepted as a pitch, lower is
+                     stricter
+        minLevel -- float, RMS level of samples from -1.0 to 1.0 below which
+                    a frame is silence
+        """
+        self.rate = rate
+        self.frameSize = frameSize
+        self.tauMin = max(2, int(rate / maxFreq))
+        self.tauMax = int(rate / minFreq)
+        # correlation length
+        self.nWindow = frameSize - self.tauMax
+        if self.nWindow < self.tauMax:
+            raise Exception("frameSize {} is too small for {} Hz".format(
+                frameSize, minFreq))
+        self.threshold = threshold
+        self.minLevel = minLevel
+        self.fftSize = 1 << int(math.ceil(math.log(frameSize + self.nWindow,
+                                                   2)))
+    def detect(self, frame):
+        """Return the frequency in Hz of a frame or None if it has none.
+
+        frame -- float array of self.frameSize samples from -1.0 to 1.0
+        """
+        x = frame - frame.mean()
+        if np.sqrt(np.mean(x * x)) < self.minLevel:
+            return None
+        tauMax = self.tauMax
+        n = self.nWindow
+        # difference function d(tau) = e(0) + e(tau) - 2 r(tau)
+        spectrum = np.fft.rfft(x, self.fftSize)
+        windowSpectrum = np.fft.rfft(x[:n], self.fftSize)
+        r = np.fft.irfft(spectrum * np.conj(windowSpectrum),
+                         self.fftSize)[:tauMax + 1]
+        squares = np.concatenate(([0.0], np.cumsum(x * x)))
+        energy = squares[n:n + tauMax + 1] - squares[:tauMax + 1]
+        d = energy[0] + energy - 2.0 * r
+        # cumulative mean normalized difference
+        d[0] = 1.0
+        sums = np.cumsum(d[1:])
+        sums[sums == 0.0] = 1e-12
+        d[1:] *= np.arange(1, tauMax + 1) / sums
+        candidates = np.nonzero(d[self.tauMin:tauMax] < self.threshold)[0]
+        if not len(candidates):
+            return None
+        tau = self.tauMin + candidates[0]
+        while tau + 1 < tauMax and d[tau + 1] < d[tau]:
+            tau += 1
+        # parabolic interpolation of the minimum
+        a, b, c = d[tau - 1], d[tau], d[tau + 1]
+        denominator = a - 2.0 * b + c
+        shift = 0.5 * (a - c) / denominator if denominator else 0.0
+        return self.rate / (tau + shift)
+
+
+class NoteListener(object):
+    """Turn a stream of samples into played notes.
+
+    feed() blocks as they arrive. callback(noteName, pitch) is called when
+    a new note has been detected in nStable frames in a row, frames without
+    a clear pitch are skipped. The note is not reported again until another
+    note or silence is detected.
+    """
+    def __init__(self, callback=None, detector=None, hopSize=512, nStable=3):
+        """Initialize the listener.
+
+        callback -- callable or None, see above
+        detector -- PitchDetector, default is PitchDetector()
+        hopSize -- integer, samples between analyzed frames, the latency
+                   of a note is about frameSize + nStable * hopSize samples
+        nStable -- integer, frames that must agree
+        """
+        if detector is None:
+            detector = PitchDetector()
+        self.callback = callback
+        self.detector = detector
+        self.hopSize = hopSize
+        self.nStable = nStable
+        self._buffer = np.zeros(detector.frameSize, dtype=np.float32)
+        # samples buffered since the last frame
+        self._nNew = 0
+        self._candidate = None
+        self._count = 0
+        self._reported = None
+        # samples fed so far
+        self.nSamples = 0
+    def feed(self, samples):
+        """Analyze a block of samples.
+
+        samples -- float array from -1.0 to 1.0 or int16 array, any length
+
+        Return a list of (sample index, noteName, pitch) tuples of the notes
+        reported in this block.
+        """
+        if samples.dtype == np.int16:
+            samples = samples / 32768.0
+        result = []
+        start = 0
+        while start < len(samples):
+            n = min(self.hopSize - self._nNew, len(samples) - start)
+            self._buffer[:-n] = self._buffer[n:]
+            self._buffer[-n:] = samples[start:start + n]
+            self._nNew += n
+            start += n
+            self.nSamples += n
+            if self._nNew < self.hopSize:
+                break
+            self._nNew = 0
+            note = self._frame()
+            if note is not None:
+                result.append((self.nSamples,) + note)
+                if self.callback is not None:
+                    self.callback(*note)
+        return result
+    def _frame(self):
+        """Analyze the buffered frame. Return a new (noteName, pitch) or None.
+        """
+        frame = self._buffer
+        if np.sqrt(np.mean(frame * frame)) < self.detector.minLevel:
+            # silence, the same note may be played again
+            self._candidate = self._reported = None
+            self._count = 0
+            return None
+        freq = self.detector.detect(frame)
+        if freq is None:
+            # noise or a change of note, neither breaks nor confirms
+            return None
+        pitch = pitchOf(freq)[0]
+        if pitch != self._candidate:
+            self._candidate = pitch
+            self._count = 1
+        else:
+            self._count += 1
+        if self._count < self.nStable or pitch == self._reported:
+            return None
+        self._reported = pitch
+        return noteNameOf(pitch), pitch
+    def reset(self):
+        """Forget the buffered samples and the reported note. Return None.
+        """
+        self._buffer[:] = 0.0
+        self._nNew = 0
+        self._candidate = None
+        self._count = 0
+        self._reported = None
+
+
+def readWav(path, blockFrames=512):
+    """Generate the blocks of a 16 bit WAV file, mixed to mono.
+
+    Yield (rate, int16 array) tuples.
+    """
+    f = wave.open(path, 'rb')
+    try:
+        if f.getsampwidth() != 2:
+            raise Exception("{}: only 16 bit WAV files are supported".format(
+                path))
+        nChannels = f.getnchannels()
+        rate = f.getframerate()
+        while True:
+            data = f.readframes(blockFrames)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype='<i2')
+            if nChannels > 1:
+                samples = samples.reshape(-1, nChannels).mean(
+                    axis=1).astype(np.int16)
+            yield rate, samples
+    finally:
+        f.close()
+def audioInput(listener, parent=None, bufferFrames=512):
+    """Feed the sound card input to a listener with Qt.
+
+    listener -- NoteListener, its detector rate is used
+    parent -- QObject or None
+    bufferFrames -- integer, input buffer size, smaller is lower latency
+
+    Requires QtMultimedia. Return the started QAudioInput, keep a reference
+    to it and call stop() on it when done.
+    """
+    from PyQt4.QtCore import SIGNAL
+    from PyQt4.QtMultimedia import QAudio, QAudioFormat, QAudioInput
+
+    fmt = QAudioFormat()
+    fmt.setFrequency(listener.detector.rate)
+    fmt.setChannels(1)
+    fmt.setSampleSize(16)
+    fmt.setCodec('audio/pcm')
+    fmt.setByteOrder(QAudioFormat.LittleEndian)
+    fmt.setSampleType(QAudioFormat.SignedInt)
+    audio = QAudioInput(fmt, parent)
+    audio.setBufferSize(bufferFrames * 2)
+    device = audio.start()
+    if audio.error() != QAudio.NoError or device is None:
+        raise Exception("Could not open the audio input")
+    def onReadyRead():
+        data = bytes(device.readAll())
+        # an odd byte count leaves half a sample, drop it
+        data = data[:len(data) & ~1]
+        if data:
+            listener.feed(np.frombuffer(data, dtype='<i2'))
+    audio.connect(device, SIGNAL('readyRead()'), onReadyRead)
+    # the device and the slot must live as long as the input
+    audio.device = device
+    audio.onReadyRead = onReadyRead
+    return audio
+def parseArgs(argv):
+    """Return the parsed command line options.
+    """
+    parser = argparse.ArgumentParser(
+        description='Print the notes played in a WAV file.')
+    parser.add_argument('path', metavar='FILE', help='16 bit WAV file')
+    parser.add_argument('-t', '--tuning', default='EADGBE',
+                        help='tuning of the neck positions shown,'
+                        ' default: %(default)s')
+    parser.add_argument('-n', '--frets', type=int, default=22,
+                        help='default: %(default)s')
+    return parser.parse_args(argv)
+def main(argv):
+    from fretboard import Fretboard
+    opts = parseArgs(argv)
+    fretboard = Fretboard(parseTuning(opts.tuning), opts.frets)
+    listener = None
+    seconds = 0.0
+    start = default_timer()
+    for rate, samples in readWav(opts.path):
+        if listener is None:
+            listener = NoteListener(detector=PitchDetector(rate))
+        for index, noteName, pitch in listener.feed(samples):
+            print('{:8.3f} s  {:2}  {}'.format(
+                index / float(rate), noteName,
+                ' '.join('{}/{}'.format(string, fret) for string, fret
+                         in fretboard.pitchPositions(pitch))))
+        seconds += len(samples) / float(rate)
+    elapsed = default_timer() - start
+    print('{:.2f} s of audio in {:.3f} s, {:.0f}x real time'.format(
+        seconds, elapsed, seconds / elapsed if elapsed else 0.0))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,130 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""prefetch.py
+
+Compute scale markings ahead of use. While a scale is shown, a background
+thread marks the neighbouring keys and scales into a bounded cache, so the
+user's next pick only looks up its markings.
+
+Saturday, October 17 2026
+"""
+
+import threading
+from collections import OrderedDict
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+from fretboard import scaleMarks
+
+
+class ScalePrefetcher(object):
+    """Scale markings by tuning, fret count, scale and key.
+
+    get() is called on the UI thread and computes a missing marking at once.
+    prefetch() queues markings for the worker thread. Only the latest
+    prefetch request is worked on, older ones are dropped.
+    """
+    # markings kept
+    cacheSize = 64
+    def __init__(self):
+        # (tuning, nFrets, scaleName, keyName) -> Marks
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # bumped by prefetch() and invalidate(), older jobs are skipped
+        self._generation = 0
+        self._queue = Queue()
+        self._worker = threading.Thread(target=self._work)
+        self._worker.daemon = True
+        self._worker.start()
+        # statistics, see: get()
+        self.hits = 0
+        self.misses = 0
+    @staticmethod
+    def _key(fretboard, scaleName, keyName):
+        return (tuple(fretboard.tuning), fretboard.nFrets, scaleName, keyName)
+    def get(self, fretboard, scaleName, keyName):
+        """Return the markings of a scale on a fretboard.
+
+        fretboard -- Fretboard
+        scaleName, keyName -- see: Fretboard.markScale()
+
+        Raise Exception if either scaleName or keyName is unknown. Return
+        Marks, see: Fretboard.setMarks().
+        """
+        key = self._key(fretboard, scaleName, keyName)
+        with self._lock:
+            marks = self._cache.pop(key, None)
+            if marks is not None:
+                self._cache[key] = marks
+        if marks is None:
+            self.misses += 1
+            marks = scaleMarks(fretboard.pcBits, scaleName, keyName)
+            with self._lock:
+                self._insert(key, marks)
+        else:
+            self.hits += 1
+        return marks
+    def _insert(self, key, marks):
+        """Add a marking to the cache, the caller holds self._lock.
+        """
+        self._cache.pop(key, None)
+        if len(self._cache) >= self.cacheSize:
+            # drop the least recently used
+            self._cache.popitem(last=False)
+        self._cache[key] = marks
+    def prefetch(self, fretboard, scales):
+        """Compute markings in the background.
+
+        fretboard -- Fretboard, its current tuning and note tables are used
+        scales -- list of (scaleName, keyName) tuples, most likely first
+
+        Pending prefetches are dropped. Return None.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            keys = [self._key(fretboard, scaleName, keyName)
+                    for scaleName, keyName in scales]
+            keys = [key for key in keys if key not in self._cache]
+        if keys:
+            # the note tables are shared and never modified, see:
+            # Fretboard.updateNotes()
+            self._queue.put((generation, fretboard.pcBits, keys))
+    def invalidate(self):
+        """Drop every marking and pending prefetch.
+
+        Call when the tuning or fret count of the neck changes. Return None.
+        """
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+    def close(self):
+        """Stop the worker thread. Return None.
+        """
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+    def _work(self):
+        """Worker thread. Compute queued markings of the latest request.
+        """
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            generation, pcBits, keys = job
+            for key in keys:
+                if generation != self._generation:
+                    # superseded
+                    break
+                tuning, nFrets, scaleName, keyName = key
+                try:
+                    marks = scaleMarks(pcBits, scaleName, keyName)
+                except Exception:
+                    continue
+                with self._lock:
+                    if generation != self._generation:
+                        break
+                    self._insert(key, marks)
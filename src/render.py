@@ -0,0 +1,161 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""render.py
+
+Render scale diagrams to PNG or SVG files without showing the GUI. Every
+combination of tuning, scale, key and fret count is rendered, spread over a
+pool of worker processes.
+
+usage: render.py [-h] [-o DIR] [-f {png,svg}] ...
+
+Saturday, October 17 2026
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import argparse
+from multiprocessing import Pool
+
+from PyQt4.QtCore import QRectF, QSize
+from PyQt4.QtGui import (QApplication, QGraphicsScene, QImage, QPainter,
+                         QColor)
+from PyQt4.QtCore import Qt as qt
+
+from util import TUNINGS, INTERVALS, NOTES, parseTuning
+from neck import Neck
+
+# offscreen state of a worker process, see: _initWorker()
+_worker = {}
+
+
+class OffscreenNeck(Neck):
+    """A Neck without item caches, they only slow down a single render.
+    """
+    bCacheable = False
+
+
+def fileName(tuning, nFrets, scaleName, keyName, fmt):
+    """Return the file name of a diagram, e.g. 'EADGBE_22_Major_Bb.png'.
+
+    Sharps become 's' and spaces '-' to keep names shell friendly.
+    """
+    name = '_'.join([tuning, str(nFrets), scaleName, keyName])
+    return '{}.{}'.format(name.replace('#', 's').replace(' ', '-'), fmt)
+def _initWorker(opts):
+    """Create the Qt objects reused by every job of a worker process.
+
+    The QApplication is created without GUI support, so no display is
+    needed.
+    """
+    _worker['app'] = QApplication(sys.argv, False)
+    _worker['scene'] = QGraphicsScene()
+    _worker['neck'] = OffscreenNeck()
+    _worker['neck'].setLeftHanded(opts.lefty)
+    _worker['scene'].addItem(_worker['neck'])
+    _worker['opts'] = opts
+def _renderGroup(job):
+    """Render every scale and key of one tuning and fret count.
+
+    job -- (tuning, nFrets, scaleNames, keyNames) tuple
+
+    The neck geometry and note tables are built once for the whole group.
+    Return the number of files written.
+    """
+    tuning, nFrets, scaleNames, keyNames = job
+    neck = _worker['neck']
+    opts = _worker['opts']
+    neck.setTuning(parseTuning(tuning))
+    neck.setFretCount(nFrets)
+    neck.updateAll()
+    n = 0
+    for scaleName in scaleNames:
+        for keyName in keyNames:
+            neck.markScale(scaleName, keyName)
+            path = os.path.join(opts.outDir, fileName(tuning, nFrets,
+                                                      scaleName, keyName,
+                                                      opts.format))
+            _renderFile(path, opts)
+            n += 1
+    return n
+def _renderFile(path, opts):
+    """Render the worker's scene to path.
+
+    Return None.
+    """
+    scene = _worker['scene']
+    source = scene.itemsBoundingRect()
+    width = opts.width
+    height = int(round(width * source.height() / source.width()))
+    target = QRectF(0, 0, width, height)
+    if opts.format == 'svg':
+        from PyQt4.QtSvg import QSvgGenerator
+        device = QSvgGenerator()
+        device.setFileName(path)
+        device.setSize(QSize(width, height))
+        device.setViewBox(target)
+    else:
+        device = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+        device.fill(QColor(255, 255, 255).rgba())
+    painter = QPainter(device)
+    painter.setRenderHints(QPainter.Antialiasing)
+    scene.render(painter, target, source, qt.KeepAspectRatio)
+    painter.end()
+    if opts.format != 'svg':
+        if not device.save(path):
+            raise Exception("Could not write {}".format(repr(path)))
+def jobs(tunings, fretCounts, scaleNames, keyNames):
+    """Return the render jobs, one per tuning and fret count.
+    """
+    return [(tuning, nFrets, scaleNames, keyNames)
+            for tuning in tunings for nFrets in fretCounts]
+def parseArgs(argv):
+    """Return the parsed command line options.
+    """
+    parser = argparse.ArgumentParser(
+        description='Render scale diagrams for every combination of tuning,'
+        ' scale, key and fret count.')
+    parser.add_argument('-o', '--out-dir', dest='outDir', default='diagrams',
+                        help='output directory, default: %(default)s')
+    parser.add_argument('-f', '--format', choices=['png', 'svg'],
+                        default='png', help='default: %(default)s')
+    parser.add_argument('-t', '--tunings', nargs='+',
+                        default=[t for t, tip in TUNINGS],
+                        help='default: every tuning')
+    parser.add_argument('-s', '--scales', nargs='+',
+                        default=sorted(INTERVALS.keys()),
+                        help='default: every scale')
+    parser.add_argument('-k', '--keys', nargs='+', default=NOTES,
+                        help='default: every key')
+    parser.add_argument('-n', '--frets', nargs='+', type=int, default=[22],
+                        help='fret counts, default: %(default)s')
+    parser.add_argument('-w', '--width', type=int, default=1600,
+                        help='image width in pixels, default: %(default)s')
+    parser.add_argument('-l', '--lefty', action='store_true',
+                        help='render left-handed necks')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes, default: one per CPU')
+    opts = parser.parse_args(argv)
+    for scaleName in opts.scales:
+        if scaleName not in INTERVALS:
+            parser.error('unknown scale: {}'.format(repr(scaleName)))
+    return opts
+def main(argv):
+    opts = parseArgs(argv)
+    if not os.path.isdir(opts.outDir):
+        os.makedirs(opts.outDir)
+    pool = Pool(opts.jobs, _initWorker, (opts,))
+    total = 0
+    for n in pool.imap_unordered(_renderGroup,
+                                 jobs(opts.tunings, opts.frets, opts.scales,
+                                      opts.keys)):
+        total += n
+    pool.close()
+    pool.join()
+    print('{} diagrams written to {}'.format(total, opts.outDir))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -8,15 +8,106 @@ Monday, August 26 2013
 
 import sys
 
-from PyQt4.QtCore import *
-from PyQt4.QtGui import *
+from PyQt4.QtCore import (QAbstractListModel, QModelIndex, QTimer, QVariant,
+                          SIGNAL)
+from PyQt4.QtGui import (QComboBox, QGroupBox, QHBoxLayout, QLabel,
+                         QLineEdit, QListView, QVBoxLayout)
 from PyQt4.QtCore import Qt as qt
 
 from util import INTERVALS, ASC2UNI, UNI2ASC
 
 
+class ScaleListModel(QAbstractListModel):
+    """Scale names, fetched by the view in batches and searchable.
+
+    Searching runs in chunks from the event loop, so typing never waits
+    for a large catalog to be scanned. A search that extends the previous
+    one only scans the previous matches.
+    """
+    # rows handed to the view at once
+    batchSize = 256
+    # names searched per event loop turn
+    chunkSize = 4096
+    def __init__(self, names, parent=None):
+        """Initialize the model.
+
+        names -- iterable of scale names
+        parent -- QObject or None
+        """
+        super(ScaleListModel, self).__init__(parent)
+        self.names = sorted(names)
+        # name -> lower case name, for searching
+        self.lowerNames = dict((name, name.lower()) for name in self.names)
+        self.matches = self.names
+        self.nFetched = min(self.batchSize, len(self.matches))
+        self.filterText = ''
+        # search in progress: (text, names to search, next index, matches)
+        self._search = None
+        self._timer = QTimer(self)
+        self.connect(self._timer, SIGNAL('timeout()'), self._searchChunk)
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.nFetched
+    def data(self, index, role=qt.DisplayRole):
+        if role != qt.DisplayRole or not index.isValid():
+            return QVariant()
+        return QVariant(self.matches[index.row()])
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.nFetched < len(self.matches)
+    def fetchMore(self, parent):
+        n = min(self.batchSize, len(self.matches) - self.nFetched)
+        if parent.isValid() or n <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.nFetched,
+                             self.nFetched + n - 1)
+        self.nFetched += n
+        self.endInsertRows()
+    def name(self, row):
+        """Return the scale name shown in row.
+        """
+        return self.matches[row]
+    def setFilter(self, text):
+        """Show only the scales whose names contain text, ignoring case.
+
+        The search finishes later from the event loop. Emit filtered() when
+        the rows are updated. Return None.
+        """
+        text = unicode(text).lower()
+        if text == self.filterText and self._search is None:
+            return
+        if self._search is None and text.startswith(self.filterText):
+            # narrowing the finished search
+            names = self.matches
+        else:
+            names = self.names
+        self.filterText = text
+        self._search = (text, names, 0, [])
+        self._timer.start(0)
+    def _searchChunk(self):
+        """Search the next chunk of names, finish the search at the end.
+        """
+        text, names, start, found = self._search
+        end = start + self.chunkSize
+        lowerNames = self.lowerNames
+        found.extend([name for name in names[start:end]
+                      if text in lowerNames[name]])
+        if end < len(names):
+            self._search = (text, names, end, found)
+            return
+        self._timer.stop()
+        self._search = None
+        self.beginResetModel()
+        self.matches = found
+        self.nFetched = min(self.batchSize, len(found))
+        self.endResetModel()
+        self.emit(SIGNAL('filtered()'))
+
+
 class ScaleWidget(QGroupBox):
     """Select key and scale widget
+
+    Emits scaleChanged(const QString&) when a scale is selected.
     """
     def __init__(self, parent=None):
         super(ScaleWidget, self).__init__('Scales', parent)
@@ -26,22 +117,76 @@ class ScaleWidget(QGroupBox):
                          "Ab A A# Bb B C C# Db D D#"
                          " Eb E F F# Gb G G#".split()]:
             self.keyComboBox.addItem(noteName)
-        self.scaleListView = QListWidget()
-        for scale in sorted(INTERVALS.keys()):
-            self.scaleListView.addItem(scale)
-        self.scaleListView.setCurrentRow(0)
+        self.searchLineEdit = QLineEdit()
+        self.searchLineEdit.setToolTip('Search scale names')
+        self.scaleModel = ScaleListModel(INTERVALS.keys(), self)
+        self.scaleListView = QListView()
+        self.scaleListView.setUniformItemSizes(True)
+        self.scaleListView.setModel(self.scaleModel)
+        # the selected scale, it stays selected while filtered out
+        self._curScale = None
+        self.connect(self.scaleListView.selectionModel(),
+                     SIGNAL('currentChanged(const QModelIndex&,'
+                            ' const QModelIndex&)'),
+                     self._onCurrentChanged)
+        self.connect(self.searchLineEdit,
+                     SIGNAL('textChanged(const QString&)'),
+                     self.scaleModel.setFilter)
+        self.connect(self.scaleModel, SIGNAL('filtered()'),
+                     self._onFiltered)
+        if self.scaleModel.rowCount():
+            self.scaleListView.setCurrentIndex(self.scaleModel.index(0))
         vLayout = QVBoxLayout(self)
         hLayout = QHBoxLayout()
         hLayout.addWidget(keyLabel)
         hLayout.addWidget(self.keyComboBox)
         hLayout.addStretch(1)
         vLayout.addLayout(hLayout)
+        vLayout.addWidget(self.searchLineEdit)
         vLayout.addWidget(self.scaleListView)
         self.setLayout(vLayout)
+    def _onCurrentChanged(self, current, previous):
+        if not current.isValid():
+            return
+        name = self.scaleModel.name(current.row())
+        if name == self._curScale:
+            return
+        self._curScale = name
+        self.emit(SIGNAL('scaleChanged(const QString&)'), self._curScale)
+    def _onFiltered(self):
+        """Keep the selected scale current if it is still shown.
+        """
+        model = self.scaleModel
+        if self._curScale in model.matches:
+            row = model.matches.index(self._curScale)
+            while row >= model.rowCount():
+                model.fetchMore(QModelIndex())
+            self.scaleListView.setCurrentIndex(model.index(row))
     def curScale(self):
         """Return the text of the currently selected scale.
         """
-        return str(self.scaleListView.currentItem().text())
+        return str(self._curScale)
+    def neighbours(self):
+        """Return the likely next picks as (scaleName, keyName) tuples.
+
+        First the current scale in the keys next to the current key, then
+        the scales shown next to the current scale in the current key.
+        """
+        result = []
+        scaleName = self.curScale()
+        keyName = self.curKey()
+        combo = self.keyComboBox
+        for n in [combo.currentIndex() + 1, combo.currentIndex() - 1]:
+            if 0 <= n < combo.count():
+                result.append((scaleName, str(UNI2ASC[unicode(
+                    combo.itemText(n))])))
+        matches = self.scaleModel.matches
+        if self._curScale in matches:
+            row = matches.index(self._curScale)
+            for n in [row + 1, row - 1]:
+                if 0 <= n < len(matches):
+                    result.append((str(matches[n]), keyName))
+        return result
     def curKey(self):
         """Return the text of the currently selected key.
         """
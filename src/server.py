@@ -0,0 +1,219 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""server.py
+
+Answer fretboard queries over a local TCP or Unix socket, without Qt. A
+client sends one JSON object per line and gets one JSON object per line
+back, in order. Each client is served by its own thread. Note tables are
+shared by every request with the same tuning and fret count, see:
+Fretboard.updateNotes().
+
+A request has an "op" and its arguments. "tuning" defaults to "EADGBE",
+"frets" to 22 and an optional "id" is echoed back:
+
+    {"op": "note", "note": "C", "tuning": "DADGAD", "frets": 12}
+    {"op": "scale", "scale": "Major", "key": "Bb"}
+    {"op": "random", "filter": "Natural", "n": 4}
+    {"op": "patterns", "scale": "Dorian", "key": "D", "kind": "box"}
+    {"op": "tunings"}
+    {"op": "scales"}
+
+The reply is {"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+Positions are [string, fret, root] lists, string 0 is the lightest string
+and fret 0 the open string, as in Fretboard.markedNotes. A pattern, see:
+fingering.patterns(), is {"degree": ..., "cost": ..., "positions": [...]}
+with its positions lowest note first.
+
+usage: server.py [-h] [--host HOST] [-p PORT] [-u PATH]
+
+Saturday, October 17 2026
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import argparse
+try:
+    from socketserver import (ThreadingMixIn, TCPServer, StreamRequestHandler)
+except ImportError:
+    from SocketServer import (ThreadingMixIn, TCPServer, StreamRequestHandler)
+try:
+    from socketserver import UnixStreamServer
+except ImportError:
+    try:
+        from SocketServer import UnixStreamServer
+    except ImportError:
+        # not on Windows
+        UnixStreamServer = None
+
+from util import TUNINGS, INTERVALS, parseTuning
+from fretboard import Fretboard
+from fingering import patterns
+
+DEFAULT_PORT = 7710
+# longest request line accepted, in bytes
+MAX_LINE = 4096
+
+
+def _fretboard(request):
+    """Return a Fretboard of the request's tuning and fret count.
+    """
+    tuning = request.get('tuning', 'EADGBE')
+    if not isinstance(tuning, list):
+        tuning = parseTuning(str(tuning))
+    return Fretboard([str(x) for x in tuning], int(request.get('frets', 22)))
+def _positions(fretboard):
+    return [[string, fret, bRoot]
+            for string, fret, bRoot in fretboard.markedNotes]
+def _opNote(request):
+    fretboard = _fretboard(request)
+    fretboard.markAll(str(request['note']))
+    return _positions(fretboard)
+def _opScale(request):
+    fretboard = _fretboard(request)
+    fretboard.markScale(str(request['scale']), str(request['key']))
+    return _positions(fretboard)
+def _opRandom(request):
+    fretboard = _fretboard(request)
+    positions = fretboard.randomPositions(int(request.get('n', 1)),
+                                          str(request.get('filter', 'All')))
+    return [[string, fret, fretboard.allNotes[string][fret]]
+            for string, fret in positions]
+def _opPatterns(request):
+    fretboard = _fretboard(request)
+    result = []
+    for pattern in patterns(fretboard, str(request['scale']),
+                            str(request['key']),
+                            str(request.get('kind', '3nps'))):
+        roots = set(pattern.roots)
+        result.append({'degree': pattern.degree,
+                       'cost': pattern.cost,
+                       'positions': [[string, fret, (string, fret) in roots]
+                                     for string, fret in pattern.positions]})
+    return result
+def _opTunings(request):
+    return [[tuning, tip] for tuning, tip in TUNINGS]
+def _opScales(request):
+    return sorted(INTERVALS.keys())
+# op name -> function of the request returning the result
+OPS = {
+    'note': _opNote,
+    'scale': _opScale,
+    'random': _opRandom,
+    'patterns': _opPatterns,
+    'tunings': _opTunings,
+    'scales': _opScales,
+    }
+
+
+def handle(request):
+    """Answer one request.
+
+    request -- dict, see above
+
+    Return the reply dict.
+    """
+    reply = {}
+    try:
+        if not isinstance(request, dict):
+            raise Exception('a request must be a JSON object')
+        if 'id' in request:
+            reply['id'] = request['id']
+        op = OPS.get(request.get('op'))
+        if op is None:
+            raise Exception('unknown op: {}'.format(
+                json.dumps(request.get('op'))))
+        reply['result'] = op(request)
+        reply['ok'] = True
+    except KeyError as e:
+        reply['ok'] = False
+        reply['error'] = 'missing argument: {}'.format(e)
+    except Exception as e:
+        reply['ok'] = False
+        reply['error'] = str(e)
+    return reply
+def handleLine(line):
+    """Answer one request line. Return the reply line, with a newline.
+    """
+    try:
+        request = json.loads(line.decode('utf-8'))
+    except ValueError as e:
+        reply = {'ok': False, 'error': 'bad JSON: {}'.format(e)}
+    else:
+        reply = handle(request)
+    return (json.dumps(reply, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class RequestHandler(StreamRequestHandler):
+    """Serve the request lines of one client until it disconnects.
+    """
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_LINE + 1)
+            if not line:
+                break
+            if len(line) > MAX_LINE:
+                self.wfile.write(b'{"ok":false,"error":"request too long"}\n')
+                break
+            if line.strip():
+                self.wfile.write(handleLine(line))
+                self.wfile.flush()
+
+
+class ThreadingTCPServer(ThreadingMixIn, TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if UnixStreamServer is not None:
+    class ThreadingUnixServer(ThreadingMixIn, UnixStreamServer):
+        daemon_threads = True
+
+
+def createServer(host='127.0.0.1', port=DEFAULT_PORT, path=None):
+    """Create a server, call serve_forever() on it.
+
+    host, port -- TCP address, used if path is None
+    path -- string, Unix socket file name, an old one is replaced
+
+    Return the server.
+    """
+    if path is None:
+        return ThreadingTCPServer((host, port), RequestHandler)
+    if UnixStreamServer is None:
+        raise Exception('Unix sockets are not supported here')
+    if os.path.exists(path):
+        os.remove(path)
+    return ThreadingUnixServer(path, RequestHandler)
+def parseArgs(argv):
+    """Return the parsed command line options.
+    """
+    parser = argparse.ArgumentParser(
+        description='Answer fretboard queries as JSON lines.')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='default: %(default)s')
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT,
+                        help='default: %(default)s')
+    parser.add_argument('-u', '--unix', metavar='PATH',
+                        help='listen on a Unix socket instead of TCP')
+    return parser.parse_args(argv)
+def main(argv):
+    opts = parseArgs(argv)
+    server = createServer(opts.host, opts.port, opts.unix)
+    print('serving on {}'.format(opts.unix or '{}:{}'.format(opts.host,
+                                                             opts.port)))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if opts.unix and os.path.exists(opts.unix):
+            os.remove(opts.unix)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
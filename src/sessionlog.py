@@ -0,0 +1,447 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""sessionlog.py
+
+Record every drill event to a compact, append-only binary log, replay it
+and summarize it. There is one log file per month. A file starts with
+MAGIC and a version byte, followed by records:
+
+    type     1 byte, SESSION, SHOW or GUESS
+    length   varint, bytes of data
+    data     see below
+
+Times are milliseconds since the previous record of the session, as a
+varint, so a drill event takes 6 to 8 bytes. Readers skip records of
+unknown types.
+
+    SESSION  start time (float64 seconds since the epoch), user and tuning
+             (varint length, UTF-8 text)
+    SHOW     time, string, fret, pitch class, note filter index (bytes)
+    GUESS    time, pitch class, correct (bytes)
+
+Reading streams the files in blocks and summarizing keeps fixed size
+tables, so years of history are scanned in constant memory.
+
+usage: sessionlog.py [-h] [-r SPEED] [-n TOP] [FILE ...]
+
+Saturday, October 17 2026
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import glob
+import math
+import time
+import struct
+import argparse
+
+from util import NOTES, SHARP2FLAT
+
+MAGIC = b'GNECKLOG'
+VERSION = 1
+# record types
+SESSION = 1
+SHOW = 2
+GUESS = 3
+# indices of SHOW records, see: NoteGuessWidget.noteFilter()
+NOTE_FILTERS = ['All', 'Natural', 'Markers']
+# bytes read at once
+BLOCK_SIZE = 1 << 16
+
+_double = struct.Struct('<d')
+
+
+def defaultLogDir():
+    """Return the folder of the session logs.
+    """
+    return os.path.join(os.path.expanduser('~'), '.gneck', 'sessions')
+def logPaths(folder=None):
+    """Return the log files of a folder, oldest first.
+
+    folder -- string, default is defaultLogDir()
+    """
+    if folder is None:
+        folder = defaultLogDir()
+    return sorted(glob.glob(os.path.join(folder, '*.glog')))
+def _varint(n):
+    """Return an unsigned integer as LEB128 bytes.
+    """
+    result = bytearray()
+    while n >= 0x80:
+        result.append((n & 0x7f) | 0x80)
+        n >>= 7
+    result.append(n)
+    return result
+def _readVarint(buf, pos):
+    """Decode a varint. Return (value, next position).
+
+    Raise IndexError if buf ends inside the varint.
+    """
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+def _text(s):
+    if not isinstance(s, bytes):
+        s = s.encode('utf-8')
+    return _varint(len(s)) + s
+def _readText(buf, pos):
+    n, pos = _readVarint(buf, pos)
+    return bytes(buf[pos:pos + n]).decode('utf-8'), pos + n
+def _pitchClass(noteName):
+    return NOTES.index(SHARP2FLAT.get(noteName, noteName))
+
+
+class SessionLog(object):
+    """Append drill events to the log file of the current month.
+
+    A session record with the user and tuning is written before the first
+    event and whenever they change, see: setSession().
+    """
+    def __init__(self, folder=None):
+        """Open the log.
+
+        folder -- string, default is defaultLogDir()
+        """
+        if folder is None:
+            folder = defaultLogDir()
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        self.folder = folder
+        self._file = None
+        self.path = None
+        # (user, tuning) of the current session
+        self.session = None
+        # time of the last record, in whole milliseconds since the session
+        self._ms = 0
+        self._start = 0.0
+    def _open(self, now):
+        """Open the log file of the month of now for appending.
+        """
+        path = os.path.join(self.folder,
+                            time.strftime('%Y-%m.glog', time.localtime(now)))
+        if path == self.path:
+            return
+        if self._file is not None:
+            self._file.close()
+        if os.path.exists(path):
+            # drop a record torn by a crash, it would hide later records
+            size = validSize(path)
+            f = open(path, 'r+b')
+            f.truncate(size)
+            f.seek(size)
+        else:
+            f = open(path, 'wb')
+            f.write(MAGIC + bytearray([VERSION]))
+        self._file = f
+        self.path = path
+    def _write(self, kind, data):
+        self._file.write(bytes(bytearray([kind]) + _varint(len(data))
+                               + data))
+    def _elapsed(self, now):
+        """Return the milliseconds since the previous record.
+        """
+        ms = max(int((now - self._start) * 1000.0), self._ms)
+        delta = ms - self._ms
+        self._ms = ms
+        return _varint(delta)
+    def setSession(self, user, tuning, now=None):
+        """Start a session unless the user and tuning are unchanged.
+
+        user -- string
+        tuning -- string, e.g. 'E A D G B E'
+        now -- float, time, default is time.time()
+
+        Return None.
+        """
+        if (user, tuning) == self.session:
+            return
+        if now is None:
+            now = time.time()
+        self._open(now)
+        self.session = (user, tuning)
+        self._start = now
+        self._ms = 0
+        self._write(SESSION, bytearray(_double.pack(now)) + _text(user)
+                    + _text(tuning))
+    def show(self, string, fret, noteName, noteFilter='All', now=None):
+        """Record a drill note shown on the neck.
+
+        string, fret -- integers, the position
+        noteName -- string, see: checkNoteName()
+        noteFilter -- string, see: NOTE_FILTERS
+        now -- float, time, default is time.time()
+
+        Raise Exception if no session was started. Return None.
+        """
+        if self.session is None:
+            raise Exception("no session, see: setSession()")
+        if now is None:
+            now = time.time()
+        self._write(SHOW, self._elapsed(now)
+                    + bytearray([string, fret, _pitchClass(noteName),
+                                 NOTE_FILTERS.index(str(noteFilter))]))
+    def guess(self, noteName, bCorrect, now=None):
+        """Record a guess of the drill note.
+
+        noteName -- string, the note guessed
+        bCorrect -- bool
+        now -- float, time, default is time.time()
+
+        Raise Exception if no session was started. Return None.
+        """
+        if self.session is None:
+            raise Exception("no session, see: setSession()")
+        if now is None:
+            now = time.time()
+        self._write(GUESS, self._elapsed(now)
+                    + bytearray([_pitchClass(noteName), int(bCorrect)]))
+    def flush(self):
+        """Hand the buffered records to the OS, e.g. after each event, so
+        a crash of the app loses none. Return None.
+        """
+        if self._file is not None:
+            self._file.flush()
+    def close(self):
+        """Close the file and end the session. Return None.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.path = None
+        self.session = None
+
+
+def _records(path, blockSize=BLOCK_SIZE):
+    """Generate the (type, data, end offset) of the records of a log file.
+
+    A torn record at the end is ignored. Raise Exception if the file is not
+    a session log.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(len(MAGIC) + 1)
+        if head[:len(MAGIC)] != MAGIC:
+            raise Exception("{}: not a session log".format(path))
+        if bytearray(head)[-1] > VERSION:
+            raise Exception("{}: log version {} is newer than {}".format(
+                path, bytearray(head)[-1], VERSION))
+        offset = len(head)
+        buf = bytearray()
+        pos = 0
+        while True:
+            block = f.read(blockSize)
+            if not block:
+                return
+            buf = buf[pos:] + bytearray(block)
+            pos = 0
+            while True:
+                try:
+                    n, start = _readVarint(buf, pos + 1)
+                except IndexError:
+                    break
+                end = start + n
+                if end > len(buf):
+                    break
+                offset += end - pos
+                yield buf[pos], buf[start:end], offset
+                pos = end
+def validSize(path):
+    """Return the size of the complete records of a log file, in bytes.
+    """
+    size = len(MAGIC) + 1
+    for kind, data, end in _records(path):
+        size = end
+    return size
+def readEvents(paths):
+    """Generate the events of log files.
+
+    paths -- list of file names, oldest first, see: logPaths()
+
+    Yield tuples:
+    ('session', time, user, tuning)
+    ('show', time, string, fret, noteName, noteFilter)
+    ('guess', time, noteName, bCorrect)
+    """
+    for path in paths:
+        start = 0.0
+        ms = 0
+        for kind, data, end in _records(path):
+            if kind == SESSION:
+                start = _double.unpack_from(bytes(data[:8]))[0]
+                ms = 0
+                user, pos = _readText(data, 8)
+                tuning, pos = _readText(data, pos)
+                yield ('session', start, user, tuning)
+            elif kind == SHOW:
+                delta, pos = _readVarint(data, 0)
+                ms += delta
+                string, fret, pc, noteFilter = data[pos:pos + 4]
+                yield ('show', start + ms / 1000.0, string, fret, NOTES[pc],
+                       NOTE_FILTERS[noteFilter])
+            elif kind == GUESS:
+                delta, pos = _readVarint(data, 0)
+                ms += delta
+                yield ('guess', start + ms / 1000.0, NOTES[data[pos]],
+                       bool(data[pos + 1]))
+def replay(events, speed=None, sleep=time.sleep):
+    """Generate events with their original spacing, scaled by speed.
+
+    events -- iterable, see: readEvents()
+    speed -- float, 10.0 replays 10 times faster than real time, None
+             does not wait at all
+
+    Idle time between sessions is skipped.
+    """
+    last = None
+    for event in events:
+        if speed and last is not None and event[0] != 'session':
+            sleep(max(event[1] - last, 0.0) / speed)
+        last = event[1]
+        yield event
+
+
+class LatencyHistogram(object):
+    """Latency percentiles in constant memory.
+
+    Latencies are counted in logarithmic bins, so a percentile is off by
+    at most half a bin, about 2.5%.
+    """
+    minLatency = 0.01
+    maxLatency = 600.0
+    # bin width as a ratio
+    ratio = 1.05
+    def __init__(self):
+        self._logRatio = math.log(self.ratio)
+        self.nBins = int(math.log(self.maxLatency / self.minLatency)
+                         / self._logRatio) + 2
+        self.counts = [0] * self.nBins
+        self.total = 0
+    def add(self, latency):
+        """Count a latency in seconds. Return None.
+        """
+        if latency <= self.minLatency:
+            n = 0
+        else:
+            n = min(int(math.log(latency / self.minLatency) / self._logRatio)
+                    + 1, self.nBins - 1)
+        self.counts[n] += 1
+        self.total += 1
+    def percentile(self, p):
+        """Return the latency below which p percent of the latencies are.
+
+        Return None if nothing was counted.
+        """
+        if not self.total:
+            return None
+        rank = p / 100.0 * self.total
+        seen = 0
+        for n, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                break
+        if n == 0:
+            return self.minLatency
+        # middle of the bin
+        return self.minLatency * self.ratio ** (n - 0.5)
+
+
+class Summary(object):
+    """Error rates per position and latency percentiles of drill events.
+
+    Only the first guess of a shown note counts, as in the drill. Memory
+    depends on the number of tunings and positions, not on the events.
+    """
+    def __init__(self):
+        # (user, tuning, string, fret) -> [answers, errors]
+        self.positions = {}
+        self.latency = LatencyHistogram()
+        self.nSessions = 0
+        self.nShown = 0
+        self._session = None
+        self._shown = None
+    def add(self, event):
+        """Account for an event, see: readEvents(). Return None.
+        """
+        kind = event[0]
+        if kind == 'session':
+            self.nSessions += 1
+            self._session = event[2:]
+            self._shown = None
+        elif kind == 'show':
+            self.nShown += 1
+            self._shown = event
+        elif kind == 'guess' and self._shown is not None:
+            shown = self._shown
+            self._shown = None
+            key = self._session + shown[2:4]
+            counts = self.positions.get(key)
+            if counts is None:
+                counts = self.positions[key] = [0, 0]
+            counts[0] += 1
+            if not event[3]:
+                counts[1] += 1
+            self.latency.add(event[1] - shown[1])
+    def errorRates(self):
+        """Return the positions by error rate, highest first.
+
+        Return a list of (rate, answers, (user, tuning, string, fret))
+        tuples.
+        """
+        return sorted(((float(errors) / answers, answers, key)
+                       for key, (answers, errors)
+                       in self.positions.items()), reverse=True)
+def summarize(events):
+    """Return the Summary of events, see: readEvents().
+    """
+    summary = Summary()
+    for event in events:
+        summary.add(event)
+    return summary
+def parseArgs(argv):
+    """Return the parsed command line options.
+    """
+    parser = argparse.ArgumentParser(
+        description='Summarize or replay drill session logs.')
+    parser.add_argument('paths', metavar='FILE', nargs='*',
+                        help='log files, default: every log in {}'.format(
+                            defaultLogDir()))
+    parser.add_argument('-r', '--replay', metavar='SPEED', type=float,
+                        help='print the events, SPEED times faster than'
+                        ' real time, 0 for no waiting')
+    parser.add_argument('-n', '--top', type=int, default=10,
+                        help='positions listed, default: %(default)s')
+    return parser.parse_args(argv)
+def main(argv):
+    opts = parseArgs(argv)
+    events = readEvents(opts.paths or logPaths())
+    if opts.replay is not None:
+        for event in replay(events, opts.replay):
+            print(time.strftime('%Y-%m-%d %H:%M:%S',
+                                time.localtime(event[1])),
+                  event[0], *event[2:])
+        return
+    started = time.time()
+    summary = summarize(events)
+    elapsed = time.time() - started
+    print('{} sessions, {} notes shown, {} answered, read in {:.2f} s'.format(
+        summary.nSessions, summary.nShown, summary.latency.total, elapsed))
+    for p in [50, 90, 99]:
+        latency = summary.latency.percentile(p)
+        if latency is not None:
+            print('latency p{}: {:.2f} s'.format(p, latency))
+    for rate, answers, key in summary.errorRates()[:opts.top]:
+        user, tuning, string, fret = key
+        print('{:5.1f}% of {:5}  {}  {}  string {} fret {}'.format(
+            rate * 100.0, answers, user, tuning, string, fret))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
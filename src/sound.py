@@ -0,0 +1,324 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""sound.py
+
+Play marked notes. Every pitch is synthesized once from a wavetable with
+NumPy and cached, so a button press only queues an existing sample. A
+Player mixes the queued samples into small blocks that a sink pulls: the
+sound card through Qt, see: audioOutput(), or a WAV file, see: writeWav().
+
+usage: sound.py [-h] [-o FILE] [-t TUNING] [-s SCALE] [-k KEY]
+
+Saturday, October 17 2026
+"""
+
+from __future__ import print_function
+
+import sys
+import wave
+import argparse
+
+import numpy as np
+
+from util import INTERVALS, parseTuning
+
+SAMPLE_RATE = 44100
+# frames mixed per block, 256 frames is under 6 ms at 44.1 kHz
+BLOCK_FRAMES = 256
+# MIDI pitch of A440
+A4_PITCH = 69
+
+
+def frequency(pitch):
+    """Return the frequency in Hz of a MIDI pitch.
+    """
+    return 440.0 * 2.0 ** ((pitch - A4_PITCH) / 12.0)
+
+
+class Wavetable(object):
+    """One period of a plucked string like waveform.
+
+    Notes are rendered by stepping through the table at a rate set by the
+    frequency, with linear interpolation, under a decaying envelope.
+    """
+    # samples in one period
+    tableSize = 2048
+    def __init__(self, harmonics=(1.0, 0.5, 0.33, 0.25, 0.12, 0.08, 0.04)):
+        """Initialize the table.
+
+        harmonics -- sequence of floats, amplitude of harmonic 1, 2, ...
+        """
+        phase = np.arange(self.tableSize) * (2.0 * np.pi / self.tableSize)
+        table = np.zeros(self.tableSize)
+        for n, amplitude in enumerate(harmonics, 1):
+            table += amplitude * np.sin(n * phase)
+        self.table = table / np.abs(table).max()
+    def render(self, freq, seconds=1.5, rate=SAMPLE_RATE, decay=3.0,
+               attack=0.005):
+        """Synthesize a note.
+
+        freq -- float, Hz
+        seconds -- float, length
+        rate -- integer, sample rate
+        decay -- float, the envelope falls by e every 1/decay seconds
+        attack -- float, seconds to full volume, avoids a click
+
+        Return a float32 array of samples from -1.0 to 1.0.
+        """
+        nFrames = int(seconds * rate)
+        size = self.tableSize
+        pos = np.arange(nFrames) * (freq * size / float(rate)) % size
+        i = pos.astype(np.intp)
+        frac = pos - i
+        table = self.table
+        samples = table[i] + (table[(i + 1) % size] - table[i]) * frac
+        t = np.arange(nFrames) / float(rate)
+        envelope = np.exp(-decay * t) * np.minimum(t / attack, 1.0)
+        # fade the tail out to avoid a click at the end
+        nFade = min(nFrames, int(0.01 * rate))
+        envelope[nFrames - nFade:] *= np.linspace(1.0, 0.0, nFade)
+        return (samples * envelope).astype(np.float32)
+
+
+class SampleCache(object):
+    """Rendered samples by MIDI pitch.
+
+    There are at most 128 pitches, so nothing is ever dropped.
+    """
+    def __init__(self, wavetable=None, seconds=1.5, rate=SAMPLE_RATE,
+                 volume=0.3):
+        """Initialize the cache.
+
+        wavetable -- Wavetable, default is Wavetable()
+        seconds -- float, length of a note
+        rate -- integer, sample rate
+        volume -- float, peak amplitude of a note, 1.0 is full scale
+        """
+        if wavetable is None:
+            wavetable = Wavetable()
+        self.wavetable = wavetable
+        self.seconds = seconds
+        self.rate = rate
+        self.volume = volume
+        self._samples = {}
+    def sample(self, pitch):
+        """Return the int16 samples of a MIDI pitch, rendered on first use.
+
+        Do not modify the array.
+        """
+        result = self._samples.get(pitch)
+        if result is None:
+            samples = self.wavetable.render(frequency(pitch), self.seconds,
+                                            self.rate)
+            result = (samples * (self.volume * 32767)).astype(np.int16)
+            self._samples[pitch] = result
+        return result
+    def preload(self, pitches):
+        """Render the samples of several pitches ahead of use.
+
+        pitches -- iterable of MIDI pitches
+
+        Return None.
+        """
+        for pitch in pitches:
+            self.sample(pitch)
+
+
+class Player(object):
+    """Mix queued notes into blocks of mono int16 samples.
+
+    A sink calls read() for each block. Queuing only appends a cached
+    sample, so play() returns at once.
+    """
+    def __init__(self, cache=None):
+        """Initialize the player.
+
+        cache -- SampleCache, default is SampleCache()
+        """
+        if cache is None:
+            cache = SampleCache()
+        self.cache = cache
+        self.rate = cache.rate
+        # frames read so far
+        self.frame = 0
+        # sounding notes, list of [samples, start frame]
+        self._voices = []
+    def preloadFretboard(self, fretboard):
+        """Render every pitch of a fretboard ahead of use.
+
+        Return None.
+        """
+        self.cache.preload(set(fretboard.pitch(string, fret)
+                               for string, stringNotes
+                               in enumerate(fretboard.allNotes)
+                               for fret in range(len(stringNotes))))
+    def play(self, pitch, delay=0.0):
+        """Queue a note.
+
+        pitch -- integer, MIDI pitch
+        delay -- float, seconds from now
+
+        Return None.
+        """
+        self._voices.append([self.cache.sample(pitch),
+                             self.frame + int(delay * self.rate)])
+    def playSequence(self, pitches, interval=0.25):
+        """Queue notes one after the other, e.g. a scale run.
+
+        pitches -- iterable of MIDI pitches
+        interval -- float, seconds between note starts
+
+        Return None.
+        """
+        for n, pitch in enumerate(pitches):
+            self.play(pitch, n * interval)
+    def stop(self):
+        """Silence every queued note. Return None.
+        """
+        self._voices = []
+    def bIdle(self):
+        """Return True if no note is sounding or queued.
+        """
+        return not self._voices
+    def read(self, nFrames=BLOCK_FRAMES):
+        """Mix the next block.
+
+        nFrames -- integer, block length
+
+        Return an int16 array of nFrames samples.
+        """
+        start = self.frame
+        end = start + nFrames
+        mix = np.zeros(nFrames, dtype=np.int32)
+        voices = []
+        for voice in self._voices:
+            samples, noteStart = voice
+            if noteStart >= end:
+                voices.append(voice)
+                continue
+            offset = max(start - noteStart, 0)
+            chunk = samples[offset:offset + end - max(noteStart, start)]
+            at = max(noteStart - start, 0)
+            mix[at:at + len(chunk)] += chunk
+            if offset + len(chunk) < len(samples):
+                voices.append(voice)
+        self._voices = voices
+        self.frame = end
+        return np.clip(mix, -32768, 32767).astype(np.int16)
+
+
+def _bytes(samples):
+    """Return int16 samples as little-endian bytes.
+    """
+    samples = samples.astype('<i2')
+    if hasattr(samples, 'tobytes'):
+        return samples.tobytes()
+    return samples.tostring()
+def writeWav(path, player, seconds=None, blockFrames=BLOCK_FRAMES):
+    """Write the output of a player to a mono 16 bit WAV file.
+
+    path -- string, file name
+    player -- Player
+    seconds -- float or None, length, default is until the player is idle
+    blockFrames -- integer, frames read from the player at once
+
+    Return the number of frames written.
+    """
+    total = 0
+    limit = None if seconds is None else int(seconds * player.rate)
+    f = wave.open(path, 'wb')
+    try:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(player.rate)
+        while True:
+            if limit is None:
+                if player.bIdle():
+                    break
+                n = blockFrames
+            else:
+                n = min(blockFrames, limit - total)
+                if n <= 0:
+                    break
+            f.writeframes(_bytes(player.read(n)))
+            total += n
+    finally:
+        f.close()
+    return total
+def audioOutput(player, parent=None, bufferFrames=4 * BLOCK_FRAMES):
+    """Play a player through the sound card with Qt.
+
+    player -- Player
+    parent -- QObject or None
+    bufferFrames -- integer, output buffer size, smaller is lower latency
+
+    Requires QtMultimedia. Return the started QAudioOutput, keep a reference
+    to it.
+    """
+    from PyQt4.QtCore import QIODevice
+    from PyQt4.QtMultimedia import QAudio, QAudioFormat, QAudioOutput
+
+    class PlayerDevice(QIODevice):
+        """Read-only device that pulls blocks from the player.
+        """
+        def readData(self, maxLen):
+            nFrames = min(maxLen // 2, bufferFrames)
+            if nFrames <= 0:
+                return b''
+            return _bytes(player.read(nFrames))
+        def writeData(self, data):
+            return -1
+        def bytesAvailable(self):
+            return bufferFrames * 2 + super(PlayerDevice,
+                                            self).bytesAvailable()
+    fmt = QAudioFormat()
+    fmt.setFrequency(player.rate)
+    fmt.setChannels(1)
+    fmt.setSampleSize(16)
+    fmt.setCodec('audio/pcm')
+    fmt.setByteOrder(QAudioFormat.LittleEndian)
+    fmt.setSampleType(QAudioFormat.SignedInt)
+    output = QAudioOutput(fmt, parent)
+    output.setBufferSize(bufferFrames * 2)
+    device = PlayerDevice(output)
+    device.open(QIODevice.ReadOnly)
+    output.start(device)
+    if output.error() != QAudio.NoError:
+        raise Exception("Could not open the audio output")
+    # the device must live as long as the output
+    output.device = device
+    return output
+def parseArgs(argv):
+    """Return the parsed command line options.
+    """
+    parser = argparse.ArgumentParser(
+        description='Write a scale run to a WAV file.')
+    parser.add_argument('-o', '--output', default='scale.wav',
+                        help='WAV file, default: %(default)s')
+    parser.add_argument('-t', '--tuning', default='EADGBE',
+                        help='default: %(default)s')
+    parser.add_argument('-s', '--scale', default='Major',
+                        help='default: %(default)s')
+    parser.add_argument('-k', '--key', default='C',
+                        help='default: %(default)s')
+    parser.add_argument('-n', '--frets', type=int, default=12,
+                        help='default: %(default)s')
+    opts = parser.parse_args(argv)
+    if opts.scale not in INTERVALS:
+        parser.error('unknown scale: {}'.format(repr(opts.scale)))
+    return opts
+def main(argv):
+    from fretboard import Fretboard
+    opts = parseArgs(argv)
+    fretboard = Fretboard(parseTuning(opts.tuning), opts.frets)
+    fretboard.markScale(opts.scale, opts.key)
+    player = Player()
+    player.playSequence(fretboard.markedPitches())
+    nFrames = writeWav(opts.output, player)
+    print('{:.2f} s written to {}'.format(nFrames / float(player.rate),
+                                          opts.output))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
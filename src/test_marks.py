@@ -0,0 +1,62 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""test_marks.py
+
+Tests of the bitset markings, in particular the change detection that
+decides which markers are repainted.
+
+usage: python -m unittest test_marks
+
+Saturday, October 17 2026
+"""
+
+import unittest
+
+from marks import Marks, bitPositions
+
+
+class MarksTest(unittest.TestCase):
+    def testPositions(self):
+        marks = Marks.fromPositions(3, [(0, 0), (2, 5), (2, 35)], [(1, 3)])
+        self.assertEqual(sorted(marks), [(0, 0), (1, 3), (2, 5), (2, 35)])
+        self.assertEqual(len(marks), 4)
+        self.assertTrue((1, 3) in marks)
+        self.assertFalse((1, 4) in marks)
+        self.assertTrue(marks.isRoot(1, 3))
+        self.assertFalse(marks.isRoot(2, 5))
+        self.assertEqual(Marks.fromMarkedNotes(3, marks.markedNotes()), marks)
+        self.assertFalse(Marks.empty(3))
+    def testSetOperations(self):
+        a = Marks.fromPositions(2, [(0, 1), (0, 2), (1, 4)], [(0, 1)])
+        b = Marks.fromPositions(2, [(0, 2), (1, 5)], [(1, 5)])
+        self.assertEqual(sorted(a | b),
+                         [(0, 1), (0, 2), (1, 4), (1, 5)])
+        self.assertEqual(sorted(a & b), [(0, 2)])
+        self.assertEqual(sorted(a - b), [(0, 1), (1, 4)])
+        self.assertEqual(sorted(a ^ b), [(0, 1), (1, 4), (1, 5)])
+        # roots are always marked positions
+        self.assertEqual(sorted((a & b).rootMarks()), [])
+        self.assertEqual(sorted((a | b).rootMarks()), [(0, 1), (1, 5)])
+    def testChanged(self):
+        old = Marks.fromPositions(2, [(0, 1), (0, 2), (1, 4)], [(0, 1)])
+        self.assertFalse(old.changed(old))
+        # added and removed positions
+        new = Marks.fromPositions(2, [(0, 1), (1, 4), (1, 7)], [(0, 1)])
+        self.assertEqual(sorted(new.changed(old)), [(0, 2), (1, 7)])
+        self.assertEqual(sorted(old.changed(new)), [(0, 2), (1, 7)])
+        # a position that only became a root
+        new = Marks.fromPositions(2, [(0, 1), (0, 2), (1, 4)],
+                                  [(0, 1), (1, 4)])
+        self.assertEqual(sorted(new.changed(old)), [(1, 4)])
+        # a different string count, e.g. after a tuning change
+        new = Marks.fromPositions(3, [(0, 1), (2, 0)])
+        self.assertEqual(sorted(new.changed(old)),
+                         [(0, 1), (0, 2), (1, 4), (2, 0)])
+    def testBitPositions(self):
+        self.assertEqual(list(bitPositions([0b101, 0, 1 << 36])),
+                         [(0, 0), (0, 2), (2, 36)])
+
+
+if __name__ == '__main__':
+    unittest.main()
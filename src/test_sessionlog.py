@@ -0,0 +1,120 @@
+#!/usr/bin/python -t
+# -*- coding: utf-8 -*-
+
+"""test_sessionlog.py
+
+Tests of the session log format, reader and summary.
+
+usage: python -m unittest test_sessionlog
+
+Saturday, October 17 2026
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from sessionlog import (SessionLog, readEvents, summarize, validSize,
+                        _records)
+
+# a time well inside one month, so every record goes to one file
+START = time.mktime((2026, 10, 17, 12, 0, 0, 0, 0, -1))
+
+
+class SessionLogTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+    def _write(self, log, n, now=START):
+        """Log n shown notes, each guessed once, 1.5 s apart.
+
+        Return the events expected from readEvents(), without the session.
+        """
+        events = []
+        for i in range(n):
+            string, fret = i % 6, i % 23
+            noteName = ['A', 'Bb', 'C', 'Eb'][i % 4]
+            bCorrect = i % 3 != 0
+            log.show(string, fret, noteName, 'Natural', now)
+            log.guess(noteName, bCorrect, now + 1.0)
+            events.append(('show', now, string, fret, noteName, 'Natural'))
+            events.append(('guess', now + 1.0, noteName, bCorrect))
+            now += 1.5
+        return events
+    def assertEventsEqual(self, events, expected):
+        self.assertEqual(len(events), len(expected))
+        for event, other in zip(events, expected):
+            self.assertEqual(event[0], other[0])
+            # times are kept in whole milliseconds
+            self.assertAlmostEqual(event[1], other[1], delta=0.002)
+            self.assertEqual(event[2:], other[2:])
+    def testRoundTrip(self):
+        log = SessionLog(self.folder)
+        log.setSession(u'me', 'E A D G B E', START)
+        expected = [('session', START, u'me', 'E A D G B E')]
+        expected += self._write(log, 10)
+        later = START + 100.0
+        log.setSession(u'you', 'D A D G A D', later)
+        expected.append(('session', later, u'you', 'D A D G A D'))
+        expected += self._write(log, 3, later)
+        path = log.path
+        log.close()
+        self.assertEventsEqual(list(readEvents([path])), expected)
+    def testTornTail(self):
+        log = SessionLog(self.folder)
+        log.setSession(u'me', 'E A D G B E', START)
+        expected = self._write(log, 5)
+        path = log.path
+        log.close()
+        size = os.path.getsize(path)
+        # half a record, as left by a crash
+        with open(path, 'ab') as f:
+            f.write(b'\x02\x05\x01')
+        self.assertEqual(validSize(path), size)
+        self.assertEventsEqual(list(readEvents([path]))[1:], expected)
+        # appending drops the torn record first
+        log = SessionLog(self.folder)
+        log.setSession(u'me', 'E A D G B E', START + 50.0)
+        more = self._write(log, 2, START + 50.0)
+        log.close()
+        events = list(readEvents([path]))
+        self.assertTrue(os.path.getsize(path) > size)
+        self.assertEventsEqual(events[1:11], expected)
+        self.assertEqual(events[11][0], 'session')
+        self.assertEventsEqual(events[12:], more)
+    def testBlockBoundaries(self):
+        log = SessionLog(self.folder)
+        log.setSession(u'me', 'E A D G B E', START)
+        self._write(log, 50)
+        path = log.path
+        log.close()
+        records = list(_records(path))
+        # every record split over blocks at some point
+        for blockSize in [1, 2, 3, 7, 64]:
+            self.assertEqual(list(_records(path, blockSize)), records)
+    def testSummary(self):
+        log = SessionLog(self.folder)
+        log.setSession(u'me', 'E A D G B E', START)
+        n = 100000
+        self._write(log, n)
+        path = log.path
+        log.close()
+        summary = summarize(readEvents([path]))
+        self.assertEqual(summary.nSessions, 1)
+        self.assertEqual(summary.nShown, n)
+        self.assertEqual(sum(answers for answers, errors
+                             in summary.positions.values()), n)
+        self.assertEqual(sum(errors for answers, errors
+                             in summary.positions.values()),
+                         len([i for i in range(n) if i % 3 == 0]))
+        # every latency is 1 s, within half a histogram bin
+        for p in [5, 50, 95]:
+            self.assertAlmostEqual(summary.latency.percentile(p), 1.0,
+                                   delta=0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
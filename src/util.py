@@ -6,6 +6,8 @@
 Monday, August 26 2013
 """
 
+import re
+
 def listRot(l, n):
     """Return a copy of l rotated n places.
 
@@ -15,10 +17,34 @@ def listRot(l, n):
     Return a new list"""
     return l[-n:] + l[:-n]
 
+def scalePitchClasses(rootPc, intervals):
+    """Return the pitch classes of a scale.
+
+    rootPc -- integer 0 to 11, index of the key's note in NOTES
+    intervals -- list of semitone steps, see: INTERVALS
+
+    Return a list of integers 0 to 11, starting with rootPc.
+    """
+    result = [rootPc]
+    for step in intervals[:-1]:
+        result.append((result[-1] + step) % 12)
+    return result
+
 # all note names, only flats are used internally
 NOTES = ['A', 'Bb', 'B', 'C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab']
 # sharp to flat look-up
 SHARP2FLAT = {'A#': 'Bb', 'C#': 'Db', 'D#': 'Eb', 'F#': 'Gb', 'G#': 'Ab'}
+
+def parseTuning(tuning):
+    """Split a tuning string into note names.
+
+    tuning -- string of note names from heaviest to lightest string, e.g.
+              'EADGBE' or 'AC#EAE'
+
+    Sharps are converted to flats. Return a list of note names.
+    """
+    return [SHARP2FLAT.get(x, x) for x in re.findall(r'[A-G][#b]?', tuning)]
+
 # ASCII to Unicode for notes -> GUI labels.
 # This simply keeps all the Unicode characters in one place.
 ASC2UNI = {'A#': u'A♯', 'A': 'A', 'Ab': u'A♭',
@@ -72,3 +98,20 @@ INTERVALS = {'Major': listRot(MAJ_INTERVALS, 0),
              'Major Blues': listRot(MAJ_BLUES_INTERVALS, 0),
              'Minor Blues': listRot(MAJ_BLUES_INTERVALS, 1),
              }
+# Chord tones as semitones above the root. The keys are the chord names.
+CHORDS = {'Major': [0, 4, 7],
+          'Minor': [0, 3, 7],
+          'Dim': [0, 3, 6],
+          'Aug': [0, 4, 8],
+          'Sus2': [0, 2, 7],
+          'Sus4': [0, 5, 7],
+          '6': [0, 4, 7, 9],
+          'Minor 6': [0, 3, 7, 9],
+          '7': [0, 4, 7, 10],
+          'Major 7': [0, 4, 7, 11],
+          'Minor 7': [0, 3, 7, 10],
+          'Minor 7b5': [0, 3, 6, 10],
+          'Dim 7': [0, 3, 6, 9],
+          'Add 9': [0, 4, 7, 2],
+          '9': [0, 4, 7, 10, 2],
+          }